@@ -0,0 +1,278 @@
+import numpy as np
+from collections import deque
+from grpphati.sparsifiers import CSCMatrix
+
+
+# Dimension 0 pre-pass for a boundary matrix sorted by (dimension, time)
+# A union-find pass over the 1-cells finds the negative edges, i.e. those joining two components
+# These edges, together with the 0-cells, are cleared from the matrix handed to the backend:
+#   - 0-cells are dropped, since we only report dimension 1
+#   - 1-cells become empty columns, since none of them can kill a dimension 1 class
+#   - 2-cells keep their boundaries, re-indexed onto the remaining columns
+# The pairing of 2-cells, and their representatives, are unchanged by this clearing
+# Negative edges are reported as unpaired by the backend, so we filter them back out
+class H0Clearing:
+    def __init__(self, matrix: CSCMatrix):
+        dims = np.asarray(matrix.dims)
+        self.n_cols = len(dims)
+        self.edge_idxs = np.flatnonzero(dims == 1)
+        edge_starts = matrix.indptr[self.edge_idxs]
+        self.edge_sources = matrix.indices[edge_starts]
+        self.edge_targets = matrix.indices[edge_starts + 1]
+        self.is_negative = np.zeros(self.n_cols, dtype=bool)
+        self.is_negative[self.edge_idxs[self._negative_edge_mask()]] = True
+        self.is_positive_edge = (dims == 1) & ~self.is_negative
+        # Columns handed to the backend, by their index in the original matrix
+        self.kept = np.flatnonzero(dims >= 1)
+        old_to_new = np.full(self.n_cols, -1, dtype=np.intp)
+        old_to_new[self.kept] = np.arange(len(self.kept))
+        lengths = np.diff(matrix.indptr)
+        lengths[dims != 2] = 0
+        indptr = np.zeros(len(self.kept) + 1, dtype=np.intp)
+        np.cumsum(lengths[self.kept], out=indptr[1:])
+        nnz_cols = np.repeat(np.arange(self.n_cols), np.diff(matrix.indptr))
+        indices = old_to_new[matrix.indices[dims[nnz_cols] == 2]]
+        self.matrix = CSCMatrix(indptr, indices, dims[self.kept])
+        self._forest = None
+
+    def n_cleared(self):
+        return self.n_cols - len(self.kept) + int(np.count_nonzero(self.is_negative))
+
+    # Maps an array of indices into the cleared matrix back to the original matrix
+    def original_idxs(self, idxs):
+        return self.kept[np.asarray(idxs, dtype=np.intp)]
+
+    # Maps representatives back to the original matrix as they are accessed
+    def original_reps(self, reps):
+        return _ReindexedReps(reps, self.kept)
+
+    # Maps unpaired columns back to the original matrix, keeping only positive edges
+    # Negative edges were only left unpaired because we cleared them
+    def essential_idxs(self, unpaired):
+        unpaired = self.original_idxs(unpaired)
+        return unpaired[self.is_positive_edge[unpaired]]
+
+    # Representatives for positive edges, given by their original indices
+    # Since edges were cleared, the backend's representatives are not cycles, so we build
+    # the edge together with the path joining its endpoints in the spanning forest
+    def essential_reps(self, idxs):
+        if self._forest is None:
+            self._forest = _SpanningForest(self)
+        positions = np.searchsorted(self.edge_idxs, idxs)
+        return [
+            [idx] + self._forest.path(source, target)
+            for idx, source, target in zip(
+                np.asarray(idxs).tolist(),
+                self.edge_sources[positions].tolist(),
+                self.edge_targets[positions].tolist(),
+            )
+        ]
+
+    def _negative_edge_mask(self):
+        parent = {}
+
+        def find(node):
+            root = node
+            while parent.get(root, root) != root:
+                root = parent[root]
+            # Path compression
+            while node != root:
+                parent[node], node = root, parent.get(node, node)
+            return root
+
+        negative = []
+        for source, target in zip(
+            self.edge_sources.tolist(), self.edge_targets.tolist()
+        ):
+            source_root = find(source)
+            target_root = find(target)
+            negative.append(source_root != target_root)
+            if source_root != target_root:
+                parent[source_root] = target_root
+        return np.array(negative, dtype=bool)
+
+
+# Apparent pairs pre-pass for a boundary matrix, in the order the backend will reduce it
+# A 2-cell tau and an edge sigma form an apparent pair if sigma is the youngest face of tau
+# and tau is the oldest coface of sigma, in which case they are always paired
+# We eliminate sigma from the other cofaces by adding tau to them, which is a valid
+# step of the standard reduction, and then drop both columns from the matrix
+# The reduced column of tau is its boundary after eliminating the earlier apparent pairs
+class ApparentPairs:
+    def __init__(self, matrix: CSCMatrix):
+        dims = np.asarray(matrix.dims)
+        n_cols = len(dims)
+        lengths = np.diff(matrix.indptr)
+        nnz_cols = np.repeat(np.arange(n_cols), lengths)
+        oldest_coface = np.full(n_cols, n_cols, dtype=np.intp)
+        np.minimum.at(oldest_coface, matrix.indices, nnz_cols)
+        # Boundaries are sorted, so the youngest face is the last entry
+        taus = np.flatnonzero((dims == 2) & (lengths > 0))
+        sigmas = matrix.indices[matrix.indptr[taus + 1] - 1]
+        is_apparent = oldest_coface[sigmas] == taus
+        taus = taus[is_apparent]
+        sigmas = sigmas[is_apparent]
+        self.n_cols = n_cols
+        # Pairs (sigma, tau) by their index in the original matrix, sorted by tau
+        self.pairs = np.column_stack([sigmas, taus])
+        self.pair_reps = _eliminated_taus(matrix, sigmas, taus)
+        keep = np.ones(n_cols, dtype=bool)
+        keep[sigmas] = False
+        keep[taus] = False
+        self.kept = np.flatnonzero(keep)
+        self.matrix = _eliminated_matrix(
+            matrix, nnz_cols, sigmas, taus, self.pair_reps, keep
+        )
+
+    def n_skipped(self):
+        return 2 * len(self.pairs)
+
+    def original_idxs(self, idxs):
+        return self.kept[np.asarray(idxs, dtype=np.intp)]
+
+    def original_reps(self, reps):
+        return _ReindexedReps(reps, self.kept)
+
+    # Maps pairs found by the backend back to the original matrix, followed by the apparent pairs
+    def all_pairs(self, pairs):
+        pairs = self.original_idxs(pairs).reshape(-1, 2)
+        return np.concatenate([pairs, self.pairs])
+
+    # Representatives matching all_pairs
+    def all_pair_reps(self, reps):
+        return _ConcatenatedReps(self.original_reps(reps), self.pair_reps)
+
+
+def _column(matrix, idx):
+    return matrix.indices[matrix.indptr[idx] : matrix.indptr[idx + 1]].tolist()
+
+
+# Eliminating sigma from a coface adds the current column of tau, which contains no
+# sigma other than its own (earlier ones were eliminated and later ones have later taus)
+# Hence every column ends up as its original boundary plus the current tau of each sigma
+# it originally contains; here we compute the current taus, in order
+def _eliminated_taus(matrix, sigmas, taus):
+    current = {}
+    for sigma, tau in zip(sigmas.tolist(), taus.tolist()):
+        column = set(_column(matrix, tau))
+        for face in list(column):
+            if face != sigma and face in current:
+                column ^= current[face]
+        current[sigma] = column
+    return [sorted(current[sigma]) for sigma in sigmas.tolist()]
+
+
+# Builds the matrix on the kept columns after eliminating every sigma, in bulk
+# Entries are summed mod 2 by cancelling repeated (column, row) pairs
+def _eliminated_matrix(matrix, nnz_cols, sigmas, taus, tau_columns, keep):
+    n_cols = len(keep)
+    sigma_position = np.full(n_cols, -1, dtype=np.intp)
+    sigma_position[sigmas] = np.arange(len(sigmas))
+    tau_lengths = np.array([len(col) for col in tau_columns], dtype=np.intp)
+    tau_indptr = np.zeros(len(sigmas) + 1, dtype=np.intp)
+    np.cumsum(tau_lengths, out=tau_indptr[1:])
+    tau_indices = np.fromiter(
+        (row for col in tau_columns for row in col), dtype=np.intp, count=tau_indptr[-1]
+    )
+    # Each entry in a sigma row of a kept column contributes the current tau of sigma
+    positions = sigma_position[matrix.indices]
+    hits = (positions >= 0) & keep[nnz_cols]
+    positions = positions[hits]
+    added_cols = np.repeat(nnz_cols[hits], tau_lengths[positions])
+    offsets = np.arange(len(added_cols)) - np.repeat(
+        np.cumsum(tau_lengths[positions]) - tau_lengths[positions],
+        tau_lengths[positions],
+    )
+    added_rows = tau_indices[
+        np.repeat(tau_indptr[positions], tau_lengths[positions]) + offsets
+    ]
+    kept_entries = keep[nnz_cols]
+    n_kept = int(np.count_nonzero(keep))
+    old_to_new = np.cumsum(keep) - 1
+    # Every sigma row cancels, so map them all to a dummy row n_kept
+    row_map = np.where(keep, old_to_new, n_kept)
+    n_rows = n_kept + 1
+    # Sort entries by a single (column, row) key, in the new indexing
+    keys = np.concatenate(
+        [
+            old_to_new[nnz_cols[kept_entries]] * n_rows
+            + row_map[matrix.indices[kept_entries]],
+            old_to_new[added_cols] * n_rows + row_map[added_rows],
+        ]
+    )
+    keys.sort()
+    # Keep the entries that appear an odd number of times
+    starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+    counts = np.diff(np.append(starts, len(keys)))
+    keys = keys[starts[counts % 2 == 1]]
+    indptr = np.zeros(n_kept + 1, dtype=np.intp)
+    np.cumsum(np.bincount(keys // n_rows, minlength=n_kept), out=indptr[1:])
+    return CSCMatrix(indptr, keys % n_rows, np.asarray(matrix.dims)[keep])
+
+
+# Sequence of reps whose entries are re-indexed when accessed
+class _ReindexedReps:
+    def __init__(self, reps, kept):
+        self.reps = reps
+        self.kept = kept
+
+    def __len__(self):
+        return len(self.reps)
+
+    def __getitem__(self, idx):
+        return self.kept[np.asarray(self.reps[idx], dtype=np.intp)]
+
+
+class _ConcatenatedReps:
+    def __init__(self, first, second):
+        self.first = first
+        self.second = second
+
+    def __len__(self):
+        return len(self.first) + len(self.second)
+
+    def __getitem__(self, idx):
+        if idx < len(self.first):
+            return self.first[idx]
+        return self.second[idx - len(self.first)]
+
+
+# The forest of negative edges, rooted so that we can walk between nodes
+class _SpanningForest:
+    def __init__(self, clearing):
+        adjacency = {}
+        negative = clearing.is_negative[clearing.edge_idxs]
+        for edge_idx, source, target in zip(
+            clearing.edge_idxs[negative].tolist(),
+            clearing.edge_sources[negative].tolist(),
+            clearing.edge_targets[negative].tolist(),
+        ):
+            adjacency.setdefault(source, []).append((target, edge_idx))
+            adjacency.setdefault(target, []).append((source, edge_idx))
+        # parent[node] = (parent node, edge to parent), depth[node] = distance to root
+        self.parent = {}
+        self.depth = {}
+        for root in adjacency:
+            if root in self.depth:
+                continue
+            self.parent[root] = (None, None)
+            self.depth[root] = 0
+            queue = deque([root])
+            while queue:
+                node = queue.popleft()
+                for neighbor, edge_idx in adjacency[node]:
+                    if neighbor not in self.depth:
+                        self.parent[neighbor] = (node, edge_idx)
+                        self.depth[neighbor] = self.depth[node] + 1
+                        queue.append(neighbor)
+
+    # Edges on the path from u to v, which must lie in the same tree
+    def path(self, u, v):
+        edges = []
+        while u != v:
+            if self.depth[u] >= self.depth[v]:
+                u, edge_idx = self.parent[u]
+            else:
+                v, edge_idx = self.parent[v]
+            edges.append(edge_idx)
+        return edges
@@ -1,6 +1,7 @@
 from .abstract import Backend
-from grpphati.sparsifiers import Sparsifier, ListSparsifier
-from grpphati.results import Result
+from grpphati.sparsifiers import Sparsifier, CSCSparsifier, CSCMatrix
+from grpphati.results import Result, RepList
+from grpphati.columns import sort_columns, column_dimensions, column_entrance_times
 from importlib import import_module
 import numpy as np
 
@@ -11,7 +12,7 @@ class EireneBackend(Backend):
         runtime_path=None,
         sysimage=None,
         check_version: bool = False,
-        sparsifier: Sparsifier = ListSparsifier(return_dimension=False),
+        sparsifier: Sparsifier = CSCSparsifier(),
     ):
         try:
             julia_pkg_1 = __import__("julia", fromlist=["Julia"])
@@ -33,28 +34,26 @@ class EireneBackend(Backend):
         self.sparsifier = sparsifier
 
     def compute_ph(self, cols) -> Result:
-        cols.sort(key=lambda col: col.dimension())
+        sort_columns(cols, by=("dimension",))
         # Dimension vector
-        dv = [col.dimension() for col in cols]
+        dv = column_dimensions(cols)
         # Filtration vector (entrance times)
-        fv = [col.get_entrance_time() for col in cols]
+        fv = column_entrance_times(cols)
         # Compute sparse representation
         sparse_cols = self.sparsifier(cols)
+        if not isinstance(sparse_cols, CSCMatrix):
+            sparse_cols = CSCMatrix.from_columns(sparse_cols, dv)
         if _no_two_cells(dv):
             # We need to add a dummy 2 cell to force Eirene to compute barcode in degree 1
-            sparse_cols.append([])
-            fv.append(0)
-            dv.append(2)
+            sparse_cols = sparse_cols.append_empty_column(2)
+            fv = np.append(fv, 0)
+            dv = np.append(dv, 2)
         self.main.dv = dv
         self.main.fv = fv
         # Row vector - concatenation of sparse columns (indexed from 1)
-        self.main.rv = [
-            nonzero_row + 1 for sparse_col in sparse_cols for nonzero_row in sparse_col
-        ]
+        self.main.rv = sparse_cols.indices + 1
         # Column pointers - tells us indices at which each col starts (indexed from 1)
-        col_sizes = [len(sparse_col) for sparse_col in sparse_cols]
-        col_starts = [1] + [int(s + 1) for s in np.cumsum(col_sizes)]
-        self.main.cp = list(col_starts)
+        self.main.cp = sparse_cols.indptr + 1
         # Eirene computation
         self.main.eval('C = eirene(rv=rv,cp=cp,dv=dv,fv=fv, model="complex")')
         return self._build_result(cols)
@@ -63,14 +62,17 @@ class EireneBackend(Backend):
         self.main.eval("C_barcode = barcode(C, dim=1)")
         barcode = self.main.C_barcode.tolist()
         julia_reps = self.main.C["cyclerep"][2]
-        dim1_cols = [col for col in cols if col.dimension() == 1]
-        python_reps = [_julia_to_python_rep(rep, dim1_cols) for rep in julia_reps]
+        dim1_idxs = np.flatnonzero(column_dimensions(cols) == 1)
+        python_reps = RepList.from_indices(
+            cols, (_julia_to_python_rep(rep, dim1_idxs) for rep in julia_reps)
+        )
         return Result(barcode=barcode, reps=python_reps)
 
 
 def _no_two_cells(dv):
-    return not any(dimension == 2 for dimension in dv)
+    return not np.any(dv == 2)
 
 
-def _julia_to_python_rep(julia_rep, dim1_cols):
-    return [dim1_cols[julia_idx - 1] for julia_idx in julia_rep]
+# Maps a Julia rep (1-indexed into the 1-cells) to indices into cols
+def _julia_to_python_rep(julia_rep, dim1_idxs):
+    return dim1_idxs[np.asarray(julia_rep, dtype=np.intp) - 1]
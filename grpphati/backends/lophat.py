@@ -1,6 +1,10 @@
 from .abstract import Backend
-from grpphati.sparsifiers import Sparsifier, ListSparsifier
+from grpphati.sparsifiers import Sparsifier, CSCSparsifier, CSCMatrix
 from grpphati.results import Result
+from grpphati.columns import sort_columns, column_dimensions
+from .clearing import H0Clearing, ApparentPairs
+from grpphati.utils.profiling import stage, is_profiling
+from grpphati.utils.concurrency import current_budget
 
 try:
     from lophat import compute_pairings_with_reps, LoPhatOptions, compute_pairings
@@ -13,38 +17,109 @@ else:
 class LoPHATBackend(Backend):
     def __init__(
         self,
-        sparsifier: Sparsifier = ListSparsifier(return_dimension=True),
+        sparsifier: Sparsifier = CSCSparsifier(),
         num_threads: int = 0,
         min_chunk_len: int = 10000,
         with_reps: bool = True,
+        rep_threshold: float = None,
+        rep_top_k: int = None,
+        clear_h0: bool = True,
+        apparent_pairs: bool = True,
     ):
         self.sparsifier = sparsifier
+        # 0 means use the threads left in the current ConcurrencyBudget
         self.num_threads = num_threads
         self.min_chunk_len = min_chunk_len
         self.with_reps = with_reps
+        # Only keep reps of bars with persistence at least rep_threshold
+        # and amongst the rep_top_k most persistent bars of each call to compute_ph
+        self.rep_threshold = rep_threshold
+        self.rep_top_k = rep_top_k
+        # Compute the dimension 0 pairing with union-find and clear it from the matrix
+        self.clear_h0 = clear_h0
+        # Pair off apparent pairs before handing the matrix to LoPHAT
+        self.apparent_pairs = apparent_pairs
         if not _has_lophat:
             raise ImportError("Optional dependency lophat required")
 
     def compute_ph(self, cols) -> Result:
-        # cols.sort(key=lambda col: (col.get_entrance_time(), col.dimension()))
-        cols.sort(key=lambda col: (col.dimension(), col.get_entrance_time()))
-        sparse_cols = self.sparsifier(cols)
-        opts = LoPhatOptions(
-            num_threads=self.num_threads, min_chunk_len=self.min_chunk_len
-        )
+        with stage("sort"):
+            sort_columns(cols, by=("dimension", "time"))
+        with stage("sparsify") as record:
+            sparse_cols = self.sparsifier(cols)
+            if isinstance(sparse_cols, CSCMatrix):
+                record.count("nnz", len(sparse_cols.indices))
+            elif is_profiling():
+                sparse_cols = list(sparse_cols)
+                record.count("nnz", sum(len(col[1]) for col in sparse_cols))
+        if self.clear_h0 or self.apparent_pairs:
+            sparse_cols = _as_csc_matrix(sparse_cols, cols)
+        clearing = None
+        if self.clear_h0:
+            with stage("clearing") as record:
+                clearing = H0Clearing(sparse_cols)
+                sparse_cols = clearing.matrix
+                record.count("cleared", clearing.n_cleared())
+        apparent = None
+        if self.apparent_pairs:
+            with stage("apparent_pairs") as record:
+                apparent = ApparentPairs(sparse_cols)
+                sparse_cols = apparent.matrix
+                record.count("skipped", apparent.n_skipped())
+        with stage("reduction"):
+            pairs, reps, unpaired, unpaired_reps = self._reduce(sparse_cols)
+        with stage("assembly") as record:
+            # Map everything back to indices into cols
+            if apparent is not None:
+                pairs = apparent.all_pairs(pairs)
+                unpaired = apparent.original_idxs(unpaired)
+                if self.with_reps:
+                    reps = apparent.all_pair_reps(reps)
+                    unpaired_reps = apparent.original_reps(unpaired_reps)
+            if clearing is not None:
+                pairs = clearing.original_idxs(pairs)
+                unpaired = clearing.essential_idxs(unpaired)
+                if self.with_reps:
+                    reps = clearing.original_reps(reps)
+                    unpaired_reps = clearing.essential_reps(unpaired)
+            result = Result.empty()
+            result.add_paired(pairs, cols, reps=reps)
+            result.add_unpaired_raw(unpaired, cols, reps=unpaired_reps)
+            if apparent is not None:
+                result.n_skipped = apparent.n_skipped()
+            if self.with_reps and (
+                self.rep_threshold is not None or self.rep_top_k is not None
+            ):
+                result.retain_reps(self.rep_threshold, self.rep_top_k)
+            record.count("bars", result.num_features())
+        return result
+
+    # Returns pairs, their reps, unpaired columns and their reps (reps are None if not with_reps)
+    def _reduce(self, sparse_cols):
+        # Stream columns out of the compact matrix rather than building a list
+        if isinstance(sparse_cols, CSCMatrix):
+            # LoPHAT cannot reduce an empty matrix
+            if sparse_cols.n_cols() == 0:
+                return ([], [], [], []) if self.with_reps else ([], None, [], None)
+            sparse_cols = sparse_cols.iter_columns(return_dimension=True)
+        num_threads = self.num_threads or current_budget().n_threads
+        opts = LoPhatOptions(num_threads=num_threads, min_chunk_len=self.min_chunk_len)
         if self.with_reps:
             diagram = compute_pairings_with_reps(iter(sparse_cols), options=opts)
             pairs_with_reps = list(zip(diagram.paired, diagram.paired_reps))
             pairs_with_reps.sort(key=lambda pwr: pwr[0])
             pairs = [pwr[0] for pwr in pairs_with_reps]
             reps = [pwr[1] for pwr in pairs_with_reps]
-            result = Result.empty()
-            result.add_paired(pairs, cols, reps=reps)
-            result.add_unpaired_raw(diagram.unpaired, cols, reps=diagram.unpaired_reps)
-            return result
+            return (pairs, reps, diagram.unpaired, diagram.unpaired_reps)
         else:
             diagram = compute_pairings(iter(sparse_cols), options=opts)
-            result = Result.empty()
-            result.add_paired(diagram.paired, cols, reps=None)
-            result.add_unpaired_raw(diagram.unpaired, cols, reps=None)
-            return result
+            return (list(diagram.paired), None, list(diagram.unpaired), None)
+
+
+# Other sparsifiers produce (dimension, boundary) pairs
+def _as_csc_matrix(sparse_cols, cols):
+    if isinstance(sparse_cols, CSCMatrix):
+        return sparse_cols
+    return CSCMatrix.from_columns(
+        [sparse_col for _, sparse_col in sparse_cols], column_dimensions(cols)
+    )
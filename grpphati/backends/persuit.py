@@ -1,6 +1,9 @@
 from grpphati.backends.abstract import Backend
-from grpphati.sparsifiers import Sparsifier, GeneratorSparsifier
+from grpphati.sparsifiers import Sparsifier, GeneratorSparsifier, CSCMatrix
 from grpphati.results import Result
+from grpphati.columns import sort_columns, column_dimensions
+from grpphati.utils.profiling import stage
+from .clearing import ApparentPairs
 
 try:
     from persuit import std_persuit, std_persuit_serial, std_persuit_serial_bs
@@ -16,17 +19,32 @@ class PersuitBackend(Backend):
         in_parallel=True,
         internal="vec",
         sparsifier: Sparsifier = GeneratorSparsifier(return_dimension=False),
+        apparent_pairs: bool = True,
     ):
         if not _has_persuit:
             raise ImportError("Optional dependency persuit required")
         self.in_parallel = in_parallel
         self.internal = internal
         self.sparsifier = sparsifier
+        # Pair off apparent pairs before handing the matrix to persuit
+        self.apparent_pairs = apparent_pairs
 
     def compute_ph(self, cols) -> Result:
-        cols.sort(key=lambda col: (col.get_entrance_time(), col.dimension()))
+        sort_columns(cols, by=("time", "dimension"))
         # Extract rows, ignore dimension
-        sparse_cols = self.sparsifier(iter(cols))
+        sparse_cols = self.sparsifier(cols)
+        apparent = None
+        if self.apparent_pairs:
+            with stage("apparent_pairs") as record:
+                if not isinstance(sparse_cols, CSCMatrix):
+                    sparse_cols = CSCMatrix.from_columns(
+                        list(sparse_cols), column_dimensions(cols)
+                    )
+                apparent = ApparentPairs(sparse_cols)
+                sparse_cols = apparent.matrix
+                record.count("skipped", apparent.n_skipped())
+        if isinstance(sparse_cols, CSCMatrix):
+            sparse_cols = sparse_cols.iter_columns(return_dimension=False)
         if self.in_parallel:
             pairs = std_persuit(sparse_cols)
         else:
@@ -34,8 +52,12 @@ class PersuitBackend(Backend):
                 pairs = std_persuit_serial_bs(sparse_cols)
             else:
                 pairs = std_persuit_serial(sparse_cols)
+        if apparent is not None:
+            pairs = apparent.all_pairs(pairs).tolist()
         pairs.sort()
         result = Result.empty()
         result.add_paired(pairs, cols)
         result.add_unpaired(pairs, cols)
+        if apparent is not None:
+            result.n_skipped = apparent.n_skipped()
         return result
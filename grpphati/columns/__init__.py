@@ -4,3 +4,9 @@ from .edge import EdgeCol
 from .double_edge import DoubleEdgeCol
 from .directed_triangle import DirectedTriangleCol
 from .long_square import LongSquareCol
+from .store import (
+    CellStore,
+    sort_columns,
+    column_dimensions,
+    column_entrance_times,
+)
@@ -27,3 +27,8 @@ class DirectedTriangleCol(Column):
             EdgeCol((self.two_path[1], self.two_path[2])),
             EdgeCol((self.two_path[0], self.two_path[2])),
         ]
+
+    def relabel(self, mapping):
+        return DirectedTriangleCol(
+            tuple(mapping[node] for node in self.two_path), self.entrance_time
+        )
@@ -27,3 +27,9 @@ class DoubleEdgeCol(Column):
 
     def boundary(self):
         return [EdgeCol(self.forward_edge), EdgeCol(tuple(reversed(self.forward_edge)))]
+
+    def relabel(self, mapping):
+        return DoubleEdgeCol(
+            (mapping[self.forward_edge[0]], mapping[self.forward_edge[1]]),
+            self.entrance_time,
+        )
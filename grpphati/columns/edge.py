@@ -21,3 +21,8 @@ class EdgeCol(Column):
 
     def boundary(self):
         return [NodeCol(self.edge[0]), NodeCol(self.edge[1])]
+
+    def relabel(self, mapping):
+        return EdgeCol(
+            (mapping[self.edge[0]], mapping[self.edge[1]]), self.entrance_time
+        )
@@ -32,3 +32,11 @@ class LongSquareCol(Column):
             EdgeCol((self.midpoints[0], self.end)),
             EdgeCol((self.midpoints[1], self.end)),
         ]
+
+    def relabel(self, mapping):
+        return LongSquareCol(
+            mapping[self.start],
+            (mapping[self.midpoints[0]], mapping[self.midpoints[1]]),
+            mapping[self.end],
+            self.entrance_time,
+        )
@@ -20,3 +20,6 @@ class NodeCol(Column):
 
     def boundary(self):
         return []
+
+    def relabel(self, mapping):
+        return NodeCol(mapping[self.node], self.entrance_time)
@@ -0,0 +1,265 @@
+import numpy as np
+from .node import NodeCol
+from .edge import EdgeCol
+from .double_edge import DoubleEdgeCol
+from .directed_triangle import DirectedTriangleCol
+from .long_square import LongSquareCol
+
+# Type codes
+NODE = 0
+EDGE = 1
+DOUBLE_EDGE = 2
+DIRECTED_TRIANGLE = 3
+LONG_SQUARE = 4
+
+_DIMENSIONS = np.array([0, 1, 2, 2, 2])
+_N_FACES = np.array([0, 2, 2, 3, 4])
+
+
+# A compact, columnar alternative to a list of columns
+# Cell i has type types[i], vertices nodes[vertices[i, :k]] (padded with -1) and enters at times[i]
+# Vertices are stored as
+#   NODE              [v]
+#   EDGE              [u, v]
+#   DOUBLE_EDGE       [u, v]          (the forward edge)
+#   DIRECTED_TRIANGLE [s, m, t]       (the two-path)
+#   LONG_SQUARE       [s, m_1, m_2, t]
+# Indexing or iterating builds the corresponding Column objects on demand
+class CellStore:
+    def __init__(self, nodes, types, vertices, times):
+        self.nodes = nodes
+        self.types = np.asarray(types, dtype=np.int8)
+        self.vertices = np.asarray(vertices, dtype=np.intp).reshape(-1, 4)
+        self.times = np.asarray(times, dtype=float)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        return _build_column(
+            int(self.types[idx]),
+            [self.nodes[v] for v in self.vertices[idx].tolist() if v >= 0],
+            float(self.times[idx]),
+        )
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def __add__(self, other):
+        return CellStore.concatenate([self, other])
+
+    def __repr__(self):
+        return f"CellStore with {len(self)} cells on {len(self.nodes)} nodes"
+
+    def dimensions(self):
+        return _DIMENSIONS[self.types]
+
+    def entrance_times(self):
+        return self.times
+
+    # Returns a store on the relabelled nodes, sharing the cell arrays
+    def relabel(self, mapping):
+        return CellStore(
+            [mapping[node] for node in self.nodes],
+            self.types,
+            self.vertices,
+            self.times,
+        )
+
+    def permute(self, order):
+        self.types = self.types[order]
+        self.vertices = self.vertices[order]
+        self.times = self.times[order]
+
+    # Stable sort in place, by the given keys ("dimension" or "time") in order of priority
+    def sort(self, by=("dimension", "time")):
+        keys = {"dimension": self.dimensions, "time": self.entrance_times}
+        # lexsort treats the last key as the primary key
+        order = np.lexsort([keys[key]() for key in reversed(by)])
+        self.permute(order)
+
+    # Returns the boundary matrix in compressed sparse column format (indptr, indices)
+    # Faces are identified by their position in the store and sorted within each column
+    def boundaries(self):
+        n_faces = _N_FACES[self.types]
+        indptr = np.zeros(len(self) + 1, dtype=np.intp)
+        np.cumsum(n_faces, out=indptr[1:])
+        indices = np.empty(indptr[-1], dtype=np.intp)
+        lookup = _FaceLookup(self)
+        for col_type, faces_of in _FACES.items():
+            rows = np.flatnonzero(self.types == col_type)
+            if len(rows) == 0:
+                continue
+            faces = faces_of(self.vertices[rows], lookup)
+            slots = indptr[rows][:, None] + np.arange(faces.shape[1])
+            indices[slots] = faces
+        col_idxs = np.repeat(np.arange(len(self)), n_faces)
+        if np.any(indices >= col_idxs):
+            raise ValueError("Every face must appear before its cofaces in a CellStore")
+        indices = indices[np.lexsort((indices, col_idxs))]
+        return (indptr, indices)
+
+    # Builds a store of cells of a single type from columns of vertex indexes
+    @classmethod
+    def of_type(cls, nodes, col_type, vertex_columns, times):
+        vertices = np.full((len(times), 4), -1, dtype=np.intp)
+        for idx, vertex_column in enumerate(vertex_columns):
+            vertices[:, idx] = vertex_column
+        return cls(nodes, np.full(len(times), col_type), vertices, times)
+
+    @classmethod
+    def empty(cls, nodes):
+        return cls(nodes, [], np.empty((0, 4)), [])
+
+    @classmethod
+    def from_columns(cls, cols, nodes=None):
+        if nodes is None:
+            nodes = list(
+                {node: None for col in cols for node in _column_vertices(col)[1]}
+            )
+        index = {node: idx for idx, node in enumerate(nodes)}
+        types = []
+        vertices = []
+        for col in cols:
+            col_type, col_vertices = _column_vertices(col)
+            types.append(col_type)
+            idxs = [index[node] for node in col_vertices]
+            vertices.append(idxs + [-1] * (4 - len(idxs)))
+        times = [col.get_entrance_time() for col in cols]
+        return cls(nodes, types, np.array(vertices).reshape(-1, 4), times)
+
+    # Stores on different node lists are re-indexed onto the union of their nodes
+    @staticmethod
+    def concatenate(stores):
+        nodes = stores[0].nodes
+        if all(store.nodes is nodes or store.nodes == nodes for store in stores):
+            vertices = [store.vertices for store in stores]
+        else:
+            nodes = list({node: None for store in stores for node in store.nodes})
+            index = {node: idx for idx, node in enumerate(nodes)}
+            vertices = [_reindex(store, index) for store in stores]
+        return CellStore(
+            nodes,
+            np.concatenate([store.types for store in stores]),
+            np.concatenate(vertices),
+            np.concatenate([store.times for store in stores]),
+        )
+
+
+# Sorts a list of columns or a CellStore in place
+# by the given keys ("dimension" or "time") in order of priority
+def sort_columns(cols, by=("dimension", "time")):
+    if isinstance(cols, CellStore):
+        cols.sort(by)
+        return
+    keys = {
+        "dimension": lambda col: col.dimension(),
+        "time": lambda col: col.get_entrance_time(),
+    }
+    cols.sort(key=lambda col: tuple(keys[key](col) for key in by))
+
+
+def column_dimensions(cols):
+    if isinstance(cols, CellStore):
+        return cols.dimensions()
+    return np.fromiter((col.dimension() for col in cols), dtype=int, count=len(cols))
+
+
+def column_entrance_times(cols):
+    if isinstance(cols, CellStore):
+        return cols.entrance_times()
+    return np.array([col.get_entrance_time() for col in cols], dtype=float)
+
+
+def _build_column(col_type, vertices, entrance_time):
+    if col_type == NODE:
+        return NodeCol(vertices[0], entrance_time)
+    elif col_type == EDGE:
+        return EdgeCol(tuple(vertices), entrance_time)
+    elif col_type == DOUBLE_EDGE:
+        return DoubleEdgeCol(tuple(vertices), entrance_time)
+    elif col_type == DIRECTED_TRIANGLE:
+        return DirectedTriangleCol(tuple(vertices), entrance_time)
+    else:
+        return LongSquareCol(
+            vertices[0], (vertices[1], vertices[2]), vertices[3], entrance_time
+        )
+
+
+def _column_vertices(col):
+    if isinstance(col, NodeCol):
+        return (NODE, [col.node])
+    elif isinstance(col, EdgeCol):
+        return (EDGE, list(col.edge))
+    elif isinstance(col, DoubleEdgeCol):
+        return (DOUBLE_EDGE, list(col.forward_edge))
+    elif isinstance(col, DirectedTriangleCol):
+        return (DIRECTED_TRIANGLE, list(col.two_path))
+    elif isinstance(col, LongSquareCol):
+        return (LONG_SQUARE, [col.start, col.midpoints[0], col.midpoints[1], col.end])
+    else:
+        raise ValueError(f"CellStore does not support columns of type {type(col)}")
+
+
+def _reindex(store, index):
+    old_to_new = np.array([index[node] for node in store.nodes] + [-1], dtype=np.intp)
+    # Padding entries (-1) map to the final entry, which is also -1
+    return old_to_new[store.vertices]
+
+
+# Finds the position in the store of node and edge cells
+class _FaceLookup:
+    def __init__(self, store):
+        n_nodes = len(store.nodes)
+        self.n_nodes = n_nodes
+        self.node_positions = np.full(n_nodes, -1, dtype=np.intp)
+        node_rows = np.flatnonzero(store.types == NODE)
+        self.node_positions[store.vertices[node_rows, 0]] = node_rows
+        edge_rows = np.flatnonzero(store.types == EDGE)
+        keys = store.vertices[edge_rows, 0] * n_nodes + store.vertices[edge_rows, 1]
+        order = np.argsort(keys, kind="stable")
+        self.edge_keys = keys[order]
+        self.edge_positions = edge_rows[order]
+
+    def nodes(self, vertices):
+        positions = self.node_positions[vertices]
+        if np.any(positions < 0):
+            raise KeyError("Found a node which is missing from the CellStore")
+        return positions
+
+    def edges(self, sources, targets):
+        keys = sources * self.n_nodes + targets
+        found = np.searchsorted(self.edge_keys, keys)
+        found = np.minimum(found, len(self.edge_keys) - 1)
+        if len(self.edge_keys) == 0 or np.any(self.edge_keys[found] != keys):
+            raise KeyError("Found an edge which is missing from the CellStore")
+        return self.edge_positions[found]
+
+
+# For each type, computes the faces of the given rows of vertices, in the order of Column.boundary
+_FACES = {
+    EDGE: lambda v, lookup: np.column_stack(
+        [lookup.nodes(v[:, 0]), lookup.nodes(v[:, 1])]
+    ),
+    DOUBLE_EDGE: lambda v, lookup: np.column_stack(
+        [lookup.edges(v[:, 0], v[:, 1]), lookup.edges(v[:, 1], v[:, 0])]
+    ),
+    DIRECTED_TRIANGLE: lambda v, lookup: np.column_stack(
+        [
+            lookup.edges(v[:, 0], v[:, 1]),
+            lookup.edges(v[:, 1], v[:, 2]),
+            lookup.edges(v[:, 0], v[:, 2]),
+        ]
+    ),
+    LONG_SQUARE: lambda v, lookup: np.column_stack(
+        [
+            lookup.edges(v[:, 0], v[:, 1]),
+            lookup.edges(v[:, 0], v[:, 2]),
+            lookup.edges(v[:, 1], v[:, 3]),
+            lookup.edges(v[:, 2], v[:, 3]),
+        ]
+    ),
+}
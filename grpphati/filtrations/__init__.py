@@ -1,3 +1,8 @@
-from .abstract import Filtration, StandardGroundedFiltration, ProperGroundedFiltration
-from .shortest_path import ShortestPathFiltration
+from .abstract import (
+    Filtration,
+    ArrayFiltration,
+    StandardGroundedFiltration,
+    ProperGroundedFiltration,
+)
+from .shortest_path import ShortestPathFiltration, ArrayShortestPathFiltration
 from .truncated import TruncatedFiltration
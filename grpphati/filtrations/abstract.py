@@ -1,3 +1,5 @@
+import networkx as nx
+import numpy as np
 from abc import ABC, abstractmethod
 
 
@@ -25,6 +27,81 @@ class Filtration(ABC):
     def ground(self, grounding_G):
         return StandardGroundedFiltration(grounding_G, self)
 
+    # Array-backed filtrations additionally provide node_list and distance_matrix
+    def is_array_backed(self):
+        return False
+
+
+# Every node enters at time 0 and the entrance time of (node_list[i], node_list[j])
+# is stored in distance_matrix[i, j]
+# Pairs which never enter (including the diagonal) are marked with np.inf
+class ArrayFiltration(Filtration):
+    @abstractmethod
+    def node_list(self):
+        pass
+
+    @abstractmethod
+    def distance_matrix(self):
+        pass
+
+    def is_array_backed(self):
+        return True
+
+    def node_index(self):
+        try:
+            return self._node_index
+        except AttributeError:
+            self._node_index = {node: idx for idx, node in enumerate(self.node_list())}
+            return self._node_index
+
+    # Indices of nodes whose self-loop enters at time 0, which the diagonal cannot record
+    def self_loops(self):
+        return np.empty(0, dtype=np.intp)
+
+    def edge_arrays(self):
+        distances = self.distance_matrix()
+        sources, targets = np.nonzero(np.isfinite(distances))
+        return (sources, targets, distances[sources, targets])
+
+    def node_time(self, node):
+        return 0
+
+    def edge_time(self, edge):
+        index = self.node_index()
+        try:
+            return self.distance_matrix()[index[edge[0]], index[edge[1]]]
+        except KeyError:
+            # Not a node so never enters
+            return np.inf
+
+    def node_iter(self):
+        return [(node, 0) for node in self.node_list()]
+
+    def edge_iter(self):
+        nodes = self.node_list()
+        sources, targets, times = self.edge_arrays()
+        return [
+            ((nodes[source], nodes[target]), time)
+            for source, target, time in zip(
+                sources.tolist(), targets.tolist(), times.tolist()
+            )
+        ]
+
+    def edge_dict(self):
+        nodes = self.node_list()
+        distances = self.distance_matrix()
+        edge_dict = {}
+        for source_idx, row in enumerate(distances):
+            targets = np.flatnonzero(np.isfinite(row))
+            edge_dict[nodes[source_idx]] = {
+                nodes[target]: time
+                for target, time in zip(targets.tolist(), row[targets].tolist())
+            }
+        return edge_dict
+
+    def ground(self, grounding_G):
+        return ProperGroundedFiltration(grounding_G, self)
+
 
 class StandardGroundedFiltration(Filtration):
     def __init__(self, G, filtration):
@@ -68,3 +145,29 @@ class ProperGroundedFiltration(StandardGroundedFiltration):
 
     def node_iter(self):
         return self.filtration.node_iter()
+
+    def is_array_backed(self):
+        return self.filtration.is_array_backed()
+
+    def node_list(self):
+        return self.filtration.node_list()
+
+    # The diagonal never enters an array filtration, so self-loops of G are in self_loops
+    def distance_matrix(self):
+        try:
+            return self._distance_matrix
+        except AttributeError:
+            index = {node: idx for idx, node in enumerate(self.node_list())}
+            edges = np.array(
+                [(index[i], index[j]) for i, j in self.G.edges if i != j],
+                dtype=np.intp,
+            ).reshape(-1, 2)
+            self._distance_matrix = self.filtration.distance_matrix().copy()
+            self._distance_matrix[edges[:, 0], edges[:, 1]] = 0
+            return self._distance_matrix
+
+    def self_loops(self):
+        index = {node: idx for idx, node in enumerate(self.node_list())}
+        return np.array(
+            [index[node] for node, _ in nx.selfloop_edges(self.G)], dtype=np.intp
+        )
@@ -1,12 +1,20 @@
+import os
+import tempfile
 import numpy as np
 import networkx as nx
-from .abstract import Filtration, ProperGroundedFiltration
+from joblib import Parallel, delayed
+from grpphati.utils.concurrency import current_budget
+from .abstract import Filtration, ArrayFiltration, ProperGroundedFiltration
 
 
+# If cutoff is provided then only paths of length <= cutoff enter the filtration
+# This is equivalent to truncating the filtration at cutoff but avoids the work
 class ShortestPathFiltration(Filtration):
-    def __init__(self, G):
+    def __init__(self, G, cutoff=None):
         self.nodes = G.nodes
-        self.distances = _non_trivial_dict(nx.all_pairs_dijkstra_path_length(G))
+        self.distances = _non_trivial_dict(
+            nx.all_pairs_dijkstra_path_length(G, cutoff=cutoff)
+        )
 
     def node_time(self, node):
         return 0
@@ -35,6 +43,25 @@ class ShortestPathFiltration(Filtration):
         return ProperGroundedFiltration(grounding_G, self)
 
 
+# Stores distances in a dense matrix, indexed by the position of each node in G.nodes
+# Uses a fraction of the memory of ShortestPathFiltration on large graphs
+# If n_jobs != 1 then sources are split across a process pool, within the current budget
+class ArrayShortestPathFiltration(ArrayFiltration):
+    def __init__(self, G, cutoff=None, n_jobs=1):
+        self.nodes = list(G.nodes)
+        n_jobs = current_budget().workers(n_jobs, len(self.nodes))
+        if n_jobs == 1:
+            self.distances = _distance_matrix(G, self.nodes, cutoff)
+        else:
+            self.distances = _parallel_distance_matrix(G, self.nodes, cutoff, n_jobs)
+
+    def node_list(self):
+        return self.nodes
+
+    def distance_matrix(self):
+        return self.distances
+
+
 def _non_trivial_dict(sp_iter):
     return {
         source: {
@@ -44,3 +71,52 @@ def _non_trivial_dict(sp_iter):
         }
         for source, distances in sp_iter
     }
+
+
+def _distance_matrix(G, nodes, cutoff):
+    distances = np.full((len(nodes), len(nodes)), np.inf)
+    _fill_rows(distances, G, nodes, range(len(nodes)), cutoff)
+    # Paths from a node to itself are trivial so never enter
+    np.fill_diagonal(distances, np.inf)
+    return distances
+
+
+# Workers write their rows straight into a memory-mapped matrix
+# This lives in shared memory (/dev/shm) where available
+def _parallel_distance_matrix(G, nodes, cutoff, n_jobs):
+    n_chunks = min(n_jobs, len(nodes))
+    shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    with tempfile.TemporaryDirectory(dir=shm_dir) as folder:
+        shared = np.lib.format.open_memmap(
+            os.path.join(folder, "distances.npy"),
+            mode="w+",
+            dtype=float,
+            shape=(len(nodes), len(nodes)),
+        )
+        shared[:] = np.inf
+        # Interleave sources so that each chunk gets a similar workload
+        Parallel(n_jobs=n_jobs)(
+            delayed(_fill_rows)(
+                shared, G, nodes, range(i, len(nodes), n_chunks), cutoff
+            )
+            for i in range(n_chunks)
+        )
+        distances = np.array(shared)
+        del shared
+    np.fill_diagonal(distances, np.inf)
+    return distances
+
+
+def _fill_rows(distances, G, nodes, source_idxs, cutoff):
+    index = {node: idx for idx, node in enumerate(nodes)}
+    for source_idx in source_idxs:
+        _fill_row(
+            distances[source_idx],
+            nx.single_source_dijkstra_path_length(G, nodes[source_idx], cutoff=cutoff),
+            index,
+        )
+
+
+def _fill_row(row, lengths, index):
+    targets = np.fromiter((index[target] for target in lengths.keys()), dtype=np.intp)
+    row[targets] = np.fromiter(lengths.values(), dtype=float, count=len(targets))
@@ -45,6 +45,26 @@ class TruncatedFiltration(Filtration):
             for source, distances in self.filtration.edge_dict().items()
         }
 
+    def is_array_backed(self):
+        return self.filtration.is_array_backed()
+
+    def node_list(self):
+        return self.filtration.node_list()
+
+    def distance_matrix(self):
+        try:
+            return self._distance_matrix
+        except AttributeError:
+            distances = self.filtration.distance_matrix()
+            self._distance_matrix = np.where(
+                distances <= self.truncation_time, distances, np.inf
+            )
+            return self._distance_matrix
+
+    # Self-loops enter at 0 so are never truncated
+    def self_loops(self):
+        return self.filtration.self_loops()
+
     def ground(self, grounding_G):
         return TruncatedFiltration(
             self.filtration.ground(grounding_G), self.truncation_time
@@ -1,6 +1,8 @@
+import numpy as np
 from abc import ABC, abstractclassmethod
 from grpphati.filtrations import Filtration
-from grpphati.columns import NodeCol, EdgeCol
+from grpphati.columns import NodeCol, EdgeCol, CellStore
+from grpphati.columns.store import NODE, EDGE
 
 
 class Homology(ABC):
@@ -34,3 +36,51 @@ class Homology(ABC):
     @abstractclassmethod
     def get_two_cells(cls, filtration: Filtration):
         pass
+
+    # As get_cells but returns a CellStore
+    # For array-backed filtrations the node indexing of the filtration is used
+    @classmethod
+    def get_cell_store(cls, dimensions, filtration: Filtration):
+        stores = [cls._get_cell_store_in_dim(k, filtration) for k in dimensions]
+        return CellStore.concatenate(stores)
+
+    @classmethod
+    def _get_cell_store_in_dim(cls, dimension: int, filtration: Filtration):
+        if not filtration.is_array_backed():
+            cols = cls._get_cells_in_dim(dimension, filtration)
+            return CellStore.from_columns(cols)
+        if dimension == 0:
+            return cls.get_zero_cell_store(filtration)
+        elif dimension == 1:
+            return cls.get_one_cell_store(filtration)
+        elif dimension == 2:
+            return cls.get_two_cell_store(filtration)
+        else:
+            raise ValueError("get_cell_store only supports dimensions 0, 1, 2")
+
+    # Every node of an array-backed filtration enters at 0
+    @classmethod
+    def get_zero_cell_store(cls, filtration: Filtration):
+        n_nodes = len(filtration.node_list())
+        return CellStore.of_type(
+            filtration.node_list(), NODE, [np.arange(n_nodes)], np.zeros(n_nodes)
+        )
+
+    # Self-loops of a grounding graph enter at 0, after the off-diagonal edges
+    @classmethod
+    def get_one_cell_store(cls, filtration: Filtration):
+        distances = filtration.distance_matrix()
+        sources, targets = np.nonzero(np.isfinite(distances))
+        loops = filtration.self_loops()
+        return CellStore.of_type(
+            filtration.node_list(),
+            EDGE,
+            [np.concatenate([sources, loops]), np.concatenate([targets, loops])],
+            np.concatenate([distances[sources, targets], np.zeros(len(loops))]),
+        )
+
+    # Override to avoid building column objects
+    @classmethod
+    def get_two_cell_store(cls, filtration: Filtration):
+        nodes = filtration.node_list() if filtration.is_array_backed() else None
+        return CellStore.from_columns(cls.get_two_cells(filtration), nodes)
@@ -1,11 +1,15 @@
 from .abstract import Homology
-from grpphati.columns import DirectedTriangleCol
+from grpphati.columns import DirectedTriangleCol, CellStore
+from grpphati.columns.store import DIRECTED_TRIANGLE
+from grpphati.utils.two_paths import two_path_arrays
 import numpy as np
 
 
 class DirectedFlagComplexHomology(Homology):
     @classmethod
     def get_two_cells(cls, filtration):
+        if filtration.is_array_backed():
+            return list(cls.get_two_cell_store(filtration))
         sp_lengths = filtration.edge_dict()
         return [
             DirectedTriangleCol(
@@ -21,3 +25,23 @@ class DirectedFlagComplexHomology(Homology):
             for target, second_hop_dist in sp_lengths[midpoint].items()
             if source != target and filtration.edge_time((source, target)) != np.inf
         ]
+
+    @classmethod
+    def get_two_cell_store(cls, filtration):
+        if not filtration.is_array_backed():
+            return super().get_two_cell_store(filtration)
+        return _directed_triangle_store(filtration)
+
+
+# Every two-path with a finite shortcut, entering once all three edges have entered
+# Also used by OrderedTuplesHomology
+def _directed_triangle_store(filtration):
+    sources, midpoints, targets, hop_times, shortcut_times = two_path_arrays(
+        filtration.distance_matrix(), include_double_edges=False, require_shortcut=True
+    )
+    return CellStore.of_type(
+        filtration.node_list(),
+        DIRECTED_TRIANGLE,
+        [sources, midpoints, targets],
+        np.maximum(hop_times, shortcut_times),
+    )
@@ -3,17 +3,28 @@ from grpphati.columns.edge import EdgeCol
 from grpphati.columns.node import NodeCol
 from grpphati.filtrations.truncated import TruncatedFiltration
 from .abstract import Homology
-from grpphati.columns import DoubleEdgeCol, DirectedTriangleCol, LongSquareCol
+from grpphati.columns import (
+    DoubleEdgeCol,
+    DirectedTriangleCol,
+    LongSquareCol,
+    CellStore,
+)
+from grpphati.columns.store import DOUBLE_EDGE, DIRECTED_TRIANGLE, LONG_SQUARE
+from grpphati.utils.two_paths import two_path_arrays
 
 
 class RegularPathHomology(Homology):
     @classmethod
     def get_two_cells(cls, filtration):
-        two_paths = list(_sorted_two_paths(filtration))
-        (cols, bridges) = _split_off_bridges(filtration, two_paths)
-        cols = _add_ls_collapsing_directed_triangles(cols, bridges, filtration)
-        cols = _add_long_squares(cols, bridges)
-        return cols
+        if filtration.is_array_backed():
+            return list(cls.get_two_cell_store(filtration))
+        return list(_iter_two_cells(filtration))
+
+    @classmethod
+    def get_two_cell_store(cls, filtration):
+        if not filtration.is_array_backed():
+            return super().get_two_cell_store(filtration)
+        return _two_cell_store(filtration)
 
     @classmethod
     def compute_map(cls, domain_cells, codomain_cells, vertex_map=lambda x: x):
@@ -21,62 +32,114 @@ class RegularPathHomology(Homology):
         return list(map(cm, domain_cells))
 
 
-def _sorted_two_paths(filtration):
+# Streams the two-cells one source at a time
+# so that only the two-paths out of a single source are held in memory
+def _iter_two_cells(filtration):
     sp_lengths = filtration.edge_dict()
-    paths = [
-        ((source, midpoint, target), max(first_hop_dist, second_hop_dist))
-        for source, distances in sp_lengths.items()
-        for midpoint, first_hop_dist in distances.items()
-        for target, second_hop_dist in sp_lengths[midpoint].items()
-    ]
-    paths.sort(key=lambda tup: tup[1])
-    return paths
+    for source, distances in sp_lengths.items():
+        two_paths_by_target = {}
+        for midpoint, first_hop_dist in distances.items():
+            for target, second_hop_dist in sp_lengths[midpoint].items():
+                two_path = (midpoint, max(first_hop_dist, second_hop_dist))
+                try:
+                    two_paths_by_target[target].append(two_path)
+                except KeyError:
+                    two_paths_by_target[target] = [two_path]
+        for target, two_paths in two_paths_by_target.items():
+            yield from _endpoint_two_cells(source, target, two_paths, filtration)
 
 
-def _split_off_bridges(filtration, paths):
-    cols = []
-    bridges = {}
-    for path, entrance_time in paths:
-        if path[0] == path[2]:
-            cols.append(DoubleEdgeCol((path[0], path[1]), entrance_time))
-        elif filtration.edge_time((path[0], path[2])) <= entrance_time:
+# Splits the two-paths source -> midpoint -> target into double edges, directed triangles and bridges
+# Bridges are then handled by a collapsing directed triangle and long squares
+def _endpoint_two_cells(source, target, two_paths, filtration):
+    if source == target:
+        for midpoint, entrance_time in two_paths:
+            yield DoubleEdgeCol((source, midpoint), entrance_time)
+        return
+    collapse_time = filtration.edge_time((source, target))
+    bridges = []
+    for midpoint, entrance_time in two_paths:
+        if collapse_time <= entrance_time:
             # Note entrance_time is finite because it comes from an edge_dict
-            cols.append(DirectedTriangleCol((path[0], path[1], path[2]), entrance_time))
+            yield DirectedTriangleCol((source, midpoint, target), entrance_time)
         else:
-            try:
-                bridges[(path[0], path[2])].append((path[1], entrance_time))
-            except KeyError:
-                bridges[(path[0], path[2])] = [(path[1], entrance_time)]
-    return (cols, bridges)
-
-
-def _add_ls_collapsing_directed_triangles(cols, bridges, filtration):
-    for endpoints, sub_bridges in bridges.items():
-        collapse_time = filtration.edge_time(endpoints)
-        # We add a directed triangle to collapse the first bridge to the shortcut between endpoints
-        new_triangle = (endpoints[0], sub_bridges[0][0], endpoints[1])
-        if collapse_time < np.inf:
-            cols.append(DirectedTriangleCol((new_triangle), collapse_time))
-    return cols
-
-
-def _add_long_squares(cols, bridges):
-    for endpoints, sub_bridges in bridges.items():
-        if len(sub_bridges) <= 1:
-            continue
-        first_bridge_node = sub_bridges[0][0]
-        for bridge_idx in range(1, len(sub_bridges)):
-            second_bridge_node = sub_bridges[bridge_idx][0]
-            entrance_time = sub_bridges[bridge_idx][1]
-            cols.append(
-                LongSquareCol(
-                    endpoints[0],
-                    (first_bridge_node, second_bridge_node),
-                    endpoints[1],
-                    entrance_time,
-                )
-            )
-    return cols
+            bridges.append((midpoint, entrance_time))
+    if len(bridges) == 0:
+        return
+    # Stable sort, so ties are broken in the order the midpoints were found
+    bridges.sort(key=lambda bridge: bridge[1])
+    first_bridge_node = bridges[0][0]
+    # We add a directed triangle to collapse the first bridge to the shortcut between endpoints
+    if collapse_time < np.inf:
+        yield DirectedTriangleCol((source, first_bridge_node, target), collapse_time)
+    for second_bridge_node, entrance_time in bridges[1:]:
+        yield LongSquareCol(
+            source, (first_bridge_node, second_bridge_node), target, entrance_time
+        )
+
+
+# Vectorised version of _iter_two_cells
+# Midpoints are found in index order, so ties between bridges are broken by index
+# With source_mask or target_mask, only builds cells with endpoints (s, t) such that
+# source_mask[s] or target_mask[t] (see two_path_arrays)
+def _two_cell_store(filtration, source_mask=None, target_mask=None):
+    (sources, midpoints, targets, hop_times, shortcut_times) = two_path_arrays(
+        filtration.distance_matrix(),
+        include_double_edges=True,
+        require_shortcut=False,
+        source_mask=source_mask,
+        target_mask=target_mask,
+    )
+    is_double_edge = sources == targets
+    is_triangle = ~is_double_edge & (shortcut_times <= hop_times)
+    is_bridge = ~is_double_edge & ~is_triangle
+    # Sort bridges by endpoints, then entrance time, then midpoint
+    bridges = np.flatnonzero(is_bridge)
+    order = np.lexsort(
+        (midpoints[bridges], hop_times[bridges], targets[bridges], sources[bridges])
+    )
+    bridges = bridges[order]
+    b_sources = sources[bridges]
+    b_targets = targets[bridges]
+    is_first = np.ones(len(bridges), dtype=bool)
+    is_first[1:] = (b_sources[1:] != b_sources[:-1]) | (b_targets[1:] != b_targets[:-1])
+    # For each bridge, the midpoint of the first bridge with the same endpoints
+    first_midpoints = midpoints[bridges][is_first][np.cumsum(is_first) - 1]
+    # We add a directed triangle to collapse the first bridge to the shortcut between endpoints
+    collapsing = bridges[is_first & np.isfinite(shortcut_times[bridges])]
+    long_squares = bridges[~is_first]
+    first_midpoints = first_midpoints[~is_first]
+    double_edges = np.flatnonzero(is_double_edge)
+    triangles = np.flatnonzero(is_triangle)
+    blocks = [
+        (
+            DOUBLE_EDGE,
+            [sources[double_edges], midpoints[double_edges]],
+            hop_times[double_edges],
+        ),
+        (
+            DIRECTED_TRIANGLE,
+            [sources[triangles], midpoints[triangles], targets[triangles]],
+            hop_times[triangles],
+        ),
+        (
+            DIRECTED_TRIANGLE,
+            [sources[collapsing], midpoints[collapsing], targets[collapsing]],
+            shortcut_times[collapsing],
+        ),
+        (
+            LONG_SQUARE,
+            [
+                sources[long_squares],
+                first_midpoints,
+                midpoints[long_squares],
+                targets[long_squares],
+            ],
+            hop_times[long_squares],
+        ),
+    ]
+    nodes = filtration.node_list()
+    return CellStore.concatenate([CellStore.of_type(nodes, *block) for block in blocks])
 
 
 def _cell_mapper(codomain_cells, vertex_map):
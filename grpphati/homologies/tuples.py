@@ -1,11 +1,14 @@
 from .abstract import Homology
 from grpphati.columns import DoubleEdgeCol, DirectedTriangleCol
+from .directed_flag import _directed_triangle_store
 import numpy as np
 
 
 class OrderedTuplesHomology(Homology):
     @classmethod
     def get_two_cells(cls, filtration):
+        if filtration.is_array_backed():
+            return list(cls.get_two_cell_store(filtration))
         sp_lengths = filtration.edge_dict()
         return [
             DirectedTriangleCol(
@@ -23,3 +26,10 @@ class OrderedTuplesHomology(Homology):
             for target, second_hop_dist in sp_lengths[midpoint].items()
             if filtration.edge_time((source, target)) != np.inf
         ]
+
+    # Array filtrations never contain an edge (s, s) so, as above, no double edges enter
+    @classmethod
+    def get_two_cell_store(cls, filtration):
+        if not filtration.is_array_backed():
+            return super().get_two_cell_store(filtration)
+        return _directed_triangle_store(filtration)
@@ -2,3 +2,4 @@ from .composite import *
 from .appendages import remove_appendages
 from .components import parallel_over_components
 from .check_empty import check_empty
+from .cache import ResultCache, cached, graph_fingerprint
@@ -1,9 +1,14 @@
 from grpphati.utils.graph import without_appendages
+from grpphati.utils.profiling import stage
 
 
 def remove_appendages(pipeline):
     def new_pipeline(G):
-        smaller_G = without_appendages(G)
+        with stage("appendages") as record:
+            smaller_G = without_appendages(G)
+            record.count(
+                "removed_nodes", G.number_of_nodes() - smaller_G.number_of_nodes()
+            )
         return pipeline(smaller_G)
 
     return new_pipeline
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from grpphati.utils.profiling import stage
+
+
+# Hash of the weighted digraph, which depends on the node labels since reps refer to them
+# Nodes and edges are sorted by repr, and edges without a weight have weight 1
+def graph_fingerprint(G, weight="weight"):
+    nodes = sorted(repr(node) for node in G.nodes)
+    edges = sorted(
+        (repr(u), repr(v), repr(data.get(weight, 1)))
+        for u, v, data in G.edges(data=True)
+    )
+    digest = hashlib.sha256()
+    digest.update(repr(nodes).encode())
+    digest.update(repr(edges).encode())
+    return digest.hexdigest()
+
+
+# Results keyed by graph fingerprint, with an in-memory LRU of at most maxsize results
+# If cache_dir is given, results are also pickled there, so they persist between runs
+# Use a different namespace for each pipeline that shares a cache_dir
+# Results are copied on the way in and out, since Result.merge mutates its first argument
+# Profiles are not cached, and each hit is recorded as a cache_hit stage instead
+class ResultCache:
+    def __init__(self, maxsize=128, cache_dir=None, namespace=""):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, G):
+        fingerprint = graph_fingerprint(G)
+        return f"{self.namespace}-{fingerprint}" if self.namespace else fingerprint
+
+    def get(self, key):
+        result = self._memory.get(key)
+        if result is not None:
+            self._memory.move_to_end(key)
+        elif self.cache_dir is not None:
+            result = self._load(key)
+            if result is not None:
+                self._remember(key, result)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # The profile of the run which computed the result is not part of this run
+        with stage("cache_hit") as record:
+            record.count("bars", result.num_features())
+            return _without_profile(result)
+
+    def put(self, key, result):
+        result = _without_profile(result)
+        self._remember(key, result)
+        if self.cache_dir is not None:
+            self._dump(key, result)
+
+    def clear(self):
+        self._memory.clear()
+
+    def __len__(self):
+        return len(self._memory)
+
+    def __contains__(self, key):
+        return key in self._memory or (
+            self.cache_dir is not None and os.path.exists(self._path(key))
+        )
+
+    def _remember(self, key, result):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _load(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+    # Write to a temporary file first, so that readers never see a partial pickle
+    def _dump(self, key, result):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(result, f)
+        os.replace(tmp_path, self._path(key))
+
+
+def _without_profile(result):
+    result = result.copy()
+    result.profile = None
+    return result
+
+
+def cached(pipeline, cache=None):
+    cache = ResultCache() if cache is None else cache
+
+    def new_pipeline(G):
+        key = cache.key(G)
+        with stage("cache") as record:
+            result = cache.get(key)
+            record.count("hits", int(result is not None))
+        if result is None:
+            result = pipeline(G)
+            cache.put(key, result)
+        return result
+
+    return new_pipeline
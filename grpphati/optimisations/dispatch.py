@@ -0,0 +1,225 @@
+import networkx as nx
+import numpy as np
+from joblib import Parallel, delayed
+from grpphati.results import Result
+from grpphati.utils.graph import isomorphism_classes
+from grpphati.utils.profiling import stage, is_profiling, profiled
+from grpphati.utils.concurrency import current_budget
+from grpphati.utils.pool import current_pool
+
+
+# Runs pipeline on each G.subgraph(component), in parallel, and merges the results
+# If a ResultCache is given, it is consulted (and filled) in this process,
+# so that only components missing from the cache are sent to workers
+# If deduplicate, each isomorphism class of components is only computed once,
+# and the result is relabelled onto the other members of the class
+# (unless its reps contain columns which do not implement relabel)
+def run_over_components(
+    pipeline,
+    G,
+    components,
+    n_jobs=-1,
+    prefer=None,
+    cache=None,
+    deduplicate=False,
+    name="component",
+):
+    components = list(components)
+    if len(components) == 0:
+        return Result.empty()
+    if not deduplicate:
+        results = _compute(pipeline, G, components, n_jobs, prefer, cache, name)
+        return Result.merge(*results)
+    with stage("deduplicate") as record:
+        representatives, membership = isomorphism_classes(G, components)
+        record.count("classes", len(representatives))
+    class_results = _compute(
+        pipeline,
+        G,
+        [components[idx] for idx in representatives],
+        n_jobs,
+        prefer,
+        cache,
+        name,
+    )
+    # Duplicates in a class whose reps use columns without relabel are computed directly
+    direct = [
+        idx
+        for idx, (class_idx, mapping) in enumerate(membership)
+        if mapping is not None and not class_results[class_idx].can_relabel()
+    ]
+    computed = _compute(
+        pipeline, G, [components[idx] for idx in direct], n_jobs, prefer, cache, name
+    )
+    direct_results = dict(zip(direct, computed))
+    results = []
+    for idx, (class_idx, mapping) in enumerate(membership):
+        if idx in direct_results:
+            results.append(direct_results[idx])
+        elif mapping is None:
+            results.append(class_results[class_idx])
+        else:
+            results.append(_copy_onto(class_results[class_idx], mapping))
+    return Result.merge(*results)
+
+
+# Copies of a result were not computed, so they carry no profile
+def _copy_onto(result, mapping):
+    copy = result.relabel(mapping)
+    copy.profile = None
+    return copy
+
+
+# Components costing at most INLINE_COST are run in this process, since a task would cost more
+# Components costing less than BATCH_COST are grouped into tasks costing roughly BATCH_COST
+INLINE_COST = 16
+BATCH_COST = 4096
+
+
+# Rough cost of running a pipeline on a component
+# The filtration searches the edges once from each node, and the number of 2-cells
+# grows with the number of reachable pairs, so we use nodes * edges as a cheap proxy
+def estimated_cost(subgraph):
+    return subgraph.number_of_nodes() * max(subgraph.number_of_edges(), 1)
+
+
+# Splits components into those run inline and a list of tasks, each a list of components
+# Tasks are returned in decreasing order of total cost, so that the largest start first
+def schedule(costs, inline_cost=INLINE_COST, batch_cost=BATCH_COST):
+    inline = []
+    tasks = []
+    batch = []
+    batch_total = 0
+    for idx in sorted(range(len(costs)), key=lambda idx: costs[idx], reverse=True):
+        cost = costs[idx]
+        if cost <= inline_cost:
+            inline.append(idx)
+        elif cost >= batch_cost:
+            tasks.append(([idx], cost))
+        else:
+            batch.append(idx)
+            batch_total += cost
+            if batch_total >= batch_cost:
+                tasks.append((batch, batch_total))
+                batch = []
+                batch_total = 0
+    if batch:
+        tasks.append((batch, batch_total))
+    tasks.sort(key=lambda task: task[1], reverse=True)
+    return (inline, [task for task, _ in tasks])
+
+
+# Returns the result of pipeline on each component, in order
+def _compute(pipeline, G, components, n_jobs, prefer, cache, name):
+    def run_pipeline_on_component(component):
+        subgraph = G.subgraph(component)
+        return pipeline(subgraph)
+
+    results = [None] * len(components)
+    keys = [None] * len(components)
+    if cache is not None:
+        with stage("cache") as record:
+            for idx, component in enumerate(components):
+                keys[idx] = cache.key(G.subgraph(component))
+                results[idx] = cache.get(keys[idx])
+            record.count("hits", sum(result is not None for result in results))
+    todo = [idx for idx, result in enumerate(results) if result is None]
+    with stage("schedule") as record:
+        costs = [estimated_cost(G.subgraph(components[idx])) for idx in todo]
+        inline, tasks = schedule(costs, INLINE_COST, BATCH_COST)
+        # A single task gains nothing from a worker
+        if len(tasks) == 1:
+            inline.extend(tasks.pop())
+        record.count("inline", len(inline))
+        record.count("tasks", len(tasks))
+    for position in inline:
+        idx = todo[position]
+        results[idx] = run_pipeline_on_component(components[idx])
+    if tasks:
+        # Workers have no active profile, so each one records its own
+        run_in_worker = profiled(pipeline, name=name) if is_profiling() else pipeline
+        packed_tasks = [
+            [pack_component(G, components[todo[position]]) for position in task]
+            for task in tasks
+        ]
+        # Claim workers from the budget, leaving each an equal share for inner layers
+        budget = current_budget()
+        pool = current_pool()
+        if pool is None:
+            n_workers = budget.workers(n_jobs, len(tasks))
+        else:
+            n_workers = budget.workers(pool.n_workers, len(tasks))
+        worker_budget = budget.share(n_workers)
+        if pool is None:
+            # We batch components ourselves, so joblib should dispatch tasks one at a time, in order
+            computed = Parallel(n_jobs=n_workers, prefer=prefer, batch_size=1)(
+                delayed(_run_task)(run_in_worker, packed, worker_budget)
+                for packed in packed_tasks
+            )
+        else:
+            # The pool may be larger than the budget allows, so limit the tasks in flight
+            computed = pool.map(
+                _run_task,
+                [run_in_worker] * len(tasks),
+                packed_tasks,
+                [worker_budget] * len(tasks),
+                max_pending=n_workers,
+            )
+        for task, task_results in zip(tasks, computed):
+            for position, result in zip(task, task_results):
+                results[todo[position]] = result
+    if cache is not None:
+        for idx in todo:
+            cache.put(keys[idx], results[idx])
+    return results
+
+
+# Packs G.subgraph(component) for shipping to a worker, so that the cost of pickling
+# scales with the component rather than the parent graph (which a subgraph view references)
+# Edges are sent as integer arrays into nodes, together with their weights (where present)
+# Returns (nodes, sources, targets, weights, has_weight), or (None, subgraph) if
+# nodes or edges carry any other attributes, so that the pipeline always sees the same graph
+def pack_component(G, component, weight="weight"):
+    subgraph = G.subgraph(component)
+    if type(G) is not nx.DiGraph or _has_extra_attributes(subgraph, weight):
+        return (None, subgraph.copy())
+    nodes = list(subgraph.nodes)
+    index = {node: idx for idx, node in enumerate(nodes)}
+    n_edges = subgraph.number_of_edges()
+    sources = np.empty(n_edges, dtype=np.intp)
+    targets = np.empty(n_edges, dtype=np.intp)
+    has_weight = np.zeros(n_edges, dtype=bool)
+    weights = []
+    for edge_idx, (u, v, data) in enumerate(subgraph.edges(data=True)):
+        sources[edge_idx] = index[u]
+        targets[edge_idx] = index[v]
+        if weight in data:
+            has_weight[edge_idx] = True
+            weights.append(data[weight])
+    return (nodes, sources, targets, np.asarray(weights), has_weight)
+
+
+# Rebuilds the graph from pack_component, with the original node labels and order
+def unpack_component(packed, weight="weight"):
+    if packed[0] is None:
+        return packed[1]
+    nodes, sources, targets, weights, has_weight = packed
+    G = nx.DiGraph()
+    G.add_nodes_from(nodes)
+    edges = zip(sources.tolist(), targets.tolist(), has_weight.tolist())
+    weights = iter(weights.tolist())
+    for source, target, weighted in edges:
+        data = {weight: next(weights)} if weighted else {}
+        G.add_edge(nodes[source], nodes[target], **data)
+    return G
+
+
+def _has_extra_attributes(subgraph, weight):
+    return any(len(data) > 0 for _, data in subgraph.nodes(data=True)) or any(
+        any(key != weight for key in data) for _, _, data in subgraph.edges(data=True)
+    )
+
+
+def _run_task(pipeline, packed_components, budget):
+    with budget.active():
+        return [pipeline(unpack_component(packed)) for packed in packed_components]
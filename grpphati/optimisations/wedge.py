@@ -1,24 +1,35 @@
 import networkx as nx
-from joblib import Parallel, delayed
-from grpphati.utils.graph import wedge_components
 from grpphati.results import Result
+from grpphati.utils.graph import wedge_components
+from grpphati.utils.profiling import stage
+from .dispatch import run_over_components
 
 
-def parallel_over_wedges(pipeline, prefer=None, n_jobs=-1):
-    def new_pipeline(G):
-        def run_pipeline_on_component(component):
-            subgraph = G.subgraph(component)
-            return pipeline(subgraph)
+def parallel_over_wedges(
+    pipeline, prefer=None, n_jobs=-1, cache=None, deduplicate=False
+):
+    def run(G, comps):
+        return run_over_components(
+            pipeline,
+            G,
+            comps,
+            n_jobs=n_jobs,
+            prefer=prefer,
+            cache=cache,
+            deduplicate=deduplicate,
+            name="wedge",
+        )
 
-        comps = list(wedge_components(G))
-        if len(comps) > 1:
-            sub_results = Parallel(n_jobs=n_jobs, prefer=prefer)(
-                delayed(run_pipeline_on_component)(component) for component in comps
-            )
-            return Result.merge(*sub_results)
-        elif len(comps) == 0:
-            return Result.empty()
-        else:
-            return run_pipeline_on_component(comps[0])
+    # Each self-loop is a wedge summand on its own, so the wedges are found without them
+    # and each self-loop is computed separately, rather than once per wedge at its node
+    def new_pipeline(G):
+        with stage("wedges") as record:
+            loops = list(nx.selfloop_edges(G))
+            loopless_G = nx.restricted_view(G, [], loops) if loops else G
+            comps = list(wedge_components(loopless_G))
+            record.count("wedges", len(comps) + len(loops))
+        if not loops:
+            return run(G, comps)
+        return Result.merge(run(loopless_G, comps), run(G, [{u} for u, _ in loops]))
 
     return new_pipeline
@@ -0,0 +1,80 @@
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, wait
+from grpphati.utils.concurrency import current_budget
+from grpphati.utils.pool import WorkerPool
+
+# index is the position of the graph in the input, wall_time is measured in the worker
+BatchItem = namedtuple("BatchItem", ["index", "result", "wall_time"])
+
+
+# Runs pipeline on each graph in graphs (which may be a generator), yielding a BatchItem for each
+# Graphs are consumed lazily and at most max_pending (default 2 per worker, at least 1) are in flight
+# or awaiting their turn to be yielded, so memory is bounded however many graphs there are
+# If ordered then items are yielded in the order of graphs, otherwise as they complete
+# Tasks run on executor (a WorkerPool) if given, otherwise on a pool that lives for the batch
+# Either way, at most as many tasks run at once as the budget allows
+def run_batch(
+    pipeline, graphs, n_jobs=-1, executor=None, ordered=True, max_pending=None
+):
+    if max_pending is not None and max_pending < 1:
+        raise ValueError("max_pending must be at least 1")
+    budget = current_budget()
+    n_workers = budget.workers(n_jobs if executor is None else executor.n_workers)
+    if n_workers == 1 and executor is None:
+        for idx, G in enumerate(graphs):
+            yield BatchItem(idx, *_run_graph(pipeline, G, budget))
+        return
+    worker_budget = budget.share(n_workers)
+    if max_pending is None:
+        max_pending = 2 * n_workers
+    pool = WorkerPool(n_workers) if executor is None else executor
+    graphs = enumerate(graphs)
+    # Pairs of (index, future), in the order they were submitted
+    pending = deque()
+    # Pairs of (index, graph) read but not yet submitted, since executor may have spare workers
+    queued = deque()
+
+    def submit_more():
+        while len(pending) + len(queued) < max_pending:
+            item = next(graphs, None)
+            if item is None:
+                break
+            queued.append(item)
+        running = sum(not future.done() for _, future in pending)
+        while queued and running < n_workers:
+            idx, G = queued.popleft()
+            pending.append((idx, pool.submit(_run_graph, pipeline, G, worker_budget)))
+            running += 1
+
+    try:
+        submit_more()
+        while pending:
+            if ordered:
+                ready = pending[0] if pending[0][1].done() else None
+            else:
+                ready = next((item for item in pending if item[1].done()), None)
+            if ready is None:
+                running = [future for _, future in pending if not future.done()]
+                wait(running, return_when=FIRST_COMPLETED)
+                # Replace finished tasks, even if they cannot be yielded yet
+                submit_more()
+                continue
+            pending.remove(ready)
+            idx, future = ready
+            result, wall_time = future.result()
+            # Top up before yielding, so that workers stay busy while the caller works
+            submit_more()
+            yield BatchItem(idx, result, wall_time)
+    finally:
+        for _, future in pending:
+            future.cancel()
+        if executor is None:
+            pool.shutdown(wait=False)
+
+
+def _run_graph(pipeline, G, budget):
+    with budget.active():
+        tic = time.perf_counter()
+        result = pipeline(G)
+        return (result, time.perf_counter() - tic)
@@ -0,0 +1,186 @@
+import networkx as nx
+import numpy as np
+from grpphati.backends import Backend, LoPHATBackend
+from grpphati.columns import CellStore
+from grpphati.columns.store import DOUBLE_EDGE, DIRECTED_TRIANGLE
+from grpphati.filtrations import ArrayFiltration
+from grpphati.filtrations.shortest_path import _distance_matrix, _fill_row
+from grpphati.homologies import RegularPathHomology
+from grpphati.homologies.path_homology import _two_cell_store
+from grpphati.results import Result
+from grpphati.utils.profiling import stage
+
+# Relative slack when deciding whether a shortest path may use an edge,
+# so that rounding in the sums can only cause extra rows to be recomputed
+_SLACK = 1e-9
+
+
+# GrPPH of a weighted digraph which changes by a few edges at a time
+# Keeps the shortest path distances and the two-cells of the previous snapshot, so that
+#   - an edge update only re-runs Dijkstra from the sources whose distances may change
+#   - only two-cells with an endpoint pair (s, t) where s has a changed out-distance
+#     or t has a changed in-distance are regenerated
+# The boundary matrix is still reduced from scratch by the backend on each call to result
+# No optimisations (components, appendages, truncation) are applied
+class IncrementalGrPPH:
+    # G is copied, keeping only the weight of each edge (read from the given attribute)
+    def __init__(self, G, backend: Backend = LoPHATBackend(), weight="weight"):
+        self.backend = backend
+        self.G = nx.DiGraph()
+        self.G.add_nodes_from(G.nodes)
+        self.G.add_weighted_edges_from(
+            (u, v, data.get(weight, 1)) for u, v, data in G.edges(data=True)
+        )
+        self.nodes = list(self.G.nodes)
+        self.index = {node: idx for idx, node in enumerate(self.nodes)}
+        with stage("filtration") as record:
+            self.distances = _distance_matrix(self.G, self.nodes, None)
+            record.count("nodes", len(self.nodes))
+        with stage("cells") as record:
+            self._two_cells = _two_cell_store(self._filtration())
+            record.count("cells", len(self._two_cells))
+        # Nodes whose out-distances (resp. in-distances) changed since the cells were built
+        self._changed_sources = np.zeros(len(self.nodes), dtype=bool)
+        self._changed_targets = np.zeros(len(self.nodes), dtype=bool)
+
+    # Inserts the edge (u, v), or reweights it if it already exists
+    def add_edge(self, u, v, weight=1):
+        for node in (u, v):
+            self._add_node(node)
+        old_weight = self._edge_weight(u, v)
+        self.G.add_edge(u, v, weight=weight)
+        self._update_distances(u, v, [old_weight, weight])
+
+    def remove_edge(self, u, v):
+        old_weight = self._edge_weight(u, v)
+        self.G.remove_edge(u, v)
+        self._update_distances(u, v, [old_weight])
+
+    # Applies several changes at once; removals are applied first
+    def update(self, added=(), removed=()):
+        for u, v in removed:
+            self.remove_edge(u, v)
+        for u, v, weight in added:
+            self.add_edge(u, v, weight)
+
+    def result(self) -> Result:
+        self._refresh_two_cells()
+        filtration = self._filtration()
+        with stage("cells") as record:
+            cols = (
+                RegularPathHomology.get_cell_store([0, 1], filtration.ground(self.G))
+                + self._two_cells
+            )
+            record.count("cells", len(cols))
+        return self.backend.compute_ph(cols)
+
+    def _filtration(self):
+        return _DistanceMatrixFiltration(self.nodes, self.distances)
+
+    def _edge_weight(self, u, v):
+        if not self.G.has_edge(u, v):
+            return np.inf
+        return self.G.edges[u, v]["weight"]
+
+    def _add_node(self, node):
+        if node in self.index:
+            return
+        self.index[node] = len(self.nodes)
+        self.nodes.append(node)
+        self.G.add_node(node)
+        n_nodes = len(self.nodes)
+        distances = np.full((n_nodes, n_nodes), np.inf)
+        distances[:-1, :-1] = self.distances
+        self.distances = distances
+        self._changed_sources = np.append(self._changed_sources, False)
+        self._changed_targets = np.append(self._changed_targets, False)
+        # Cell vertices index into self.nodes, which only grows
+        self._two_cells.nodes = self.nodes
+
+    # A shortest path from x to y may use (u, v) with weight w, before or after the change,
+    # only if d(x, u) + w + d(v, y) <= d(x, y), so only those rows are recomputed
+    def _update_distances(self, u, v, weights):
+        with stage("filtration") as record:
+            u_idx = self.index[u]
+            v_idx = self.index[v]
+            to_u = self.distances[:, u_idx].copy()
+            to_u[u_idx] = 0
+            from_v = self.distances[v_idx].copy()
+            from_v[v_idx] = 0
+            rows = np.zeros(len(self.nodes), dtype=bool)
+            # Only pairs (x, y) with x reaching u and v reaching y can use the edge
+            sources = np.flatnonzero(np.isfinite(to_u))
+            targets = np.flatnonzero(np.isfinite(from_v))
+            block = np.ix_(sources, targets)
+            bound = self.distances[block] * (1 + _SLACK)
+            off_diagonal = sources[:, None] != targets[None, :]
+            for weight in weights:
+                if not np.isfinite(weight):
+                    continue
+                through = to_u[sources, None] + weight + from_v[None, targets]
+                uses_edge = (through <= bound) & off_diagonal
+                rows[sources[uses_edge.any(axis=1)]] = True
+            for row_idx in np.flatnonzero(rows).tolist():
+                new_row = np.full(len(self.nodes), np.inf)
+                _fill_row(
+                    new_row,
+                    nx.single_source_dijkstra_path_length(self.G, self.nodes[row_idx]),
+                    self.index,
+                )
+                new_row[row_idx] = np.inf
+                changed = new_row != self.distances[row_idx]
+                if changed.any():
+                    self._changed_sources[row_idx] = True
+                    self._changed_targets |= changed
+                self.distances[row_idx] = new_row
+            record.count("rows", int(np.count_nonzero(rows)))
+
+    # Replaces the two-cells whose endpoints are affected by the changed distances
+    def _refresh_two_cells(self):
+        if not (self._changed_sources.any() or self._changed_targets.any()):
+            return
+        with stage("cells") as record:
+            store = self._two_cells
+            sources, targets = _endpoints(store)
+            stale = self._changed_sources[sources] | self._changed_targets[targets]
+            kept = CellStore(
+                self.nodes,
+                store.types[~stale],
+                store.vertices[~stale],
+                store.times[~stale],
+            )
+            fresh = _two_cell_store(
+                self._filtration(),
+                source_mask=self._changed_sources,
+                target_mask=self._changed_targets,
+            )
+            self._two_cells = CellStore.concatenate([kept, fresh])
+            record.count("cells", len(fresh))
+        self._changed_sources[:] = False
+        self._changed_targets[:] = False
+
+
+# The endpoint pair (s, t) of each two-cell in a store built by _two_cell_store
+# Double edges u -> v -> u have endpoints (u, u)
+def _endpoints(store):
+    sources = store.vertices[:, 0]
+    targets = np.where(
+        store.types == DOUBLE_EDGE,
+        sources,
+        np.where(
+            store.types == DIRECTED_TRIANGLE, store.vertices[:, 2], store.vertices[:, 3]
+        ),
+    )
+    return (sources, targets)
+
+
+class _DistanceMatrixFiltration(ArrayFiltration):
+    def __init__(self, nodes, distances):
+        self.nodes = nodes
+        self.distances = distances
+
+    def node_list(self):
+        return self.nodes
+
+    def distance_matrix(self):
+        return self.distances
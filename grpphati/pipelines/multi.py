@@ -0,0 +1,152 @@
+import networkx as nx
+import numpy as np
+from grpphati.filtrations import ShortestPathFiltration, TruncatedFiltration
+from grpphati.homologies import (
+    DirectedFlagComplexHomology,
+    RegularPathHomology,
+    Homology,
+)
+from grpphati.backends import Backend, LoPHATBackend
+from grpphati.columns import CellStore
+from grpphati.results import Result
+from grpphati.truncations import cone_time
+from grpphati.utils.profiling import stage
+from typing import Type
+
+
+# A descriptor computed by a multi-output pipeline
+# If grounded, the 0/1-cells come from the filtration grounded in G, as in make_grounded_pipeline
+class Descriptor:
+    def __init__(
+        self, homology_cls: Type[Homology], grounded=True, truncation_strat=None
+    ):
+        self.homology_cls = homology_cls
+        self.grounded = grounded
+        self.truncation_strat = truncation_strat
+
+    def __repr__(self):
+        return (
+            f"Descriptor({self.homology_cls.__name__}, grounded={self.grounded}, "
+            f"truncation_strat={self.truncation_strat})"
+        )
+
+
+# The descriptors of GrPPH, GrPdFlH, PPH and PdFlH
+DESCRIPTORS = {
+    "GrPPH": Descriptor(RegularPathHomology, grounded=True, truncation_strat=cone_time),
+    "GrPdFlH": Descriptor(DirectedFlagComplexHomology, grounded=True),
+    "PPH": Descriptor(RegularPathHomology, grounded=False, truncation_strat=cone_time),
+    "PdFlH": Descriptor(DirectedFlagComplexHomology, grounded=False),
+}
+
+
+# Builds a pipeline returning a dict of Results, one for each named descriptor
+# The filtration, each distinct truncation and the 0/1-cells of each grounding are computed once
+# and shared, so that only the 2-cells and the reduction are repeated per descriptor
+# If over_components, each weakly connected component with an edge is computed separately
+def make_multi_pipeline(
+    filtration_map,
+    descriptors=DESCRIPTORS,
+    backend: Backend = LoPHATBackend(),
+    over_components=True,
+    max_time=None,
+):
+    def pipeline(G):
+        if G.number_of_edges() == 0:
+            return {name: Result.empty() for name in descriptors}
+        return compute_multi_ph(G, filtration_map, descriptors, backend, max_time)
+
+    if not over_components:
+        return pipeline
+
+    def new_pipeline(G):
+        with stage("components") as record:
+            components = [
+                component
+                for component in nx.weakly_connected_components(G)
+                if G.subgraph(component).number_of_edges() > 0
+            ]
+            record.count("components", len(components))
+        if len(components) <= 1:
+            return pipeline(G.subgraph(components[0]) if components else G)
+        component_results = [
+            pipeline(G.subgraph(component)) for component in components
+        ]
+        return {
+            name: Result.merge(*[results[name] for results in component_results])
+            for name in descriptors
+        }
+
+    return new_pipeline
+
+
+def compute_multi_ph(G, filtration_map, descriptors, backend: Backend, max_time=None):
+    with stage("filtration") as record:
+        if max_time is None:
+            filtration = filtration_map(G)
+        else:
+            filtration = filtration_map(G, cutoff=max_time)
+        record.count("nodes", G.number_of_nodes())
+    # Filtrations keyed by (truncation_strat, grounded)
+    truncated = {}
+    # 0/1-cells of the untruncated filtration keyed by grounded, which every homology
+    # builds in the same way; a truncation only drops the cells entering after it
+    low_cells = {}
+    results = {}
+    for name, descriptor in descriptors.items():
+        truncation_key = (descriptor.truncation_strat, descriptor.grounded)
+        if truncation_key not in truncated:
+            truncated[truncation_key] = _truncate(filtration, *truncation_key)
+        desc_filtration = truncated[truncation_key]
+        homology = descriptor.homology_cls
+        if descriptor.grounded not in low_cells:
+            with stage("cells") as record:
+                low_cells[descriptor.grounded] = _low_cells(
+                    G, filtration, homology, descriptor.grounded
+                )
+                record.count("cells", len(low_cells[descriptor.grounded]))
+        desc_low_cells = low_cells[descriptor.grounded]
+        if isinstance(desc_filtration, TruncatedFiltration):
+            desc_low_cells = _cells_until(
+                desc_low_cells, desc_filtration.truncation_time
+            )
+        with stage("cells") as record:
+            if desc_filtration.is_array_backed():
+                two_cells = homology.get_cell_store([2], desc_filtration)
+            else:
+                two_cells = homology.get_cells([2], desc_filtration)
+            record.count("cells", len(two_cells))
+        # Concatenating builds a new list or store, so the shared cells are not reordered
+        results[name] = backend.compute_ph(desc_low_cells + two_cells)
+    return results
+
+
+def _truncate(filtration, truncation_strat, grounded):
+    if truncation_strat is None:
+        return filtration
+    with stage("truncation"):
+        t_time = truncation_strat(filtration, grounded=grounded)
+    if t_time == np.inf:
+        return filtration
+    return TruncatedFiltration(filtration, t_time)
+
+
+def _low_cells(G, filtration, homology: Type[Homology], grounded):
+    low_filtration = filtration.ground(G) if grounded else filtration
+    if filtration.is_array_backed():
+        return homology.get_cell_store([0, 1], low_filtration)
+    return homology.get_cells([0, 1], low_filtration)
+
+
+# The cells entering by t_time, in the order a TruncatedFiltration would produce them
+def _cells_until(cells, t_time):
+    if isinstance(cells, CellStore):
+        keep = cells.times <= t_time
+        return CellStore(
+            cells.nodes, cells.types[keep], cells.vertices[keep], cells.times[keep]
+        )
+    return [cell for cell in cells if cell.get_entrance_time() <= t_time]
+
+
+# Computes GrPPH, GrPdFlH, PPH and PdFlH from a single shortest path filtration
+all_descriptors = make_multi_pipeline(ShortestPathFiltration)
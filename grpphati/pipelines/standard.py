@@ -14,6 +14,9 @@ from grpphati.backends import Backend, LoPHATBackend
 from typing import Type
 
 from grpphati.truncations import cone_time
+from grpphati.utils.profiling import stage, profiled
+from grpphati.utils.concurrency import budgeted
+from grpphati.utils.pool import pooled
 
 
 def make_standard_pipeline(
@@ -22,29 +25,57 @@ def make_standard_pipeline(
     backend: Backend = LoPHATBackend(),
     optimisation_strat=None,
     truncation_strat=None,
+    max_time=None,
+    profile=False,
+    budget=None,
+    executor=None,
 ):
     pipeline = lambda G: compute_standard_ph(
-        G, filtration_map, homology_cls, backend, truncation_strat
+        G, filtration_map, homology_cls, backend, truncation_strat, max_time
     )
 
-    if optimisation_strat is None:
-        return pipeline
-    else:
-        return optimisation_strat(pipeline)
+    if optimisation_strat is not None:
+        pipeline = optimisation_strat(pipeline)
+    # Send parallel tasks to a persistent WorkerPool rather than joblib
+    if executor is not None:
+        pipeline = pooled(pipeline, executor)
+    # Share a fixed number of threads between the parallel layers and the backend
+    if budget is not None:
+        pipeline = budgeted(pipeline, budget)
+    # Record per-stage timings and attach them to the result
+    if profile:
+        pipeline = profiled(pipeline)
+    return pipeline
 
 
 def compute_standard_ph(
-    G, filtration_map, homology: Type[Homology], backend: Backend, truncation_strat
+    G,
+    filtration_map,
+    homology: Type[Homology],
+    backend: Backend,
+    truncation_strat,
+    max_time=None,
 ):
-    # Get filtration
-    filtration = filtration_map(G)
+    # Get filtration, passing max_time on as a cutoff if provided
+    with stage("filtration") as record:
+        if max_time is None:
+            filtration = filtration_map(G)
+        else:
+            filtration = filtration_map(G, cutoff=max_time)
+        record.count("nodes", G.number_of_nodes())
     # Truncate the filtration if we can
     if truncation_strat is not None:
-        t_time = truncation_strat(filtration, grounded=False)
-        if t_time != np.inf:
-            filtration = TruncatedFiltration(filtration, t_time)
-    # Build boundary matrix
-    cols = homology.get_cells([0, 1, 2], filtration)
+        with stage("truncation"):
+            t_time = truncation_strat(filtration, grounded=False)
+            if t_time != np.inf:
+                filtration = TruncatedFiltration(filtration, t_time)
+    # Build boundary matrix, as a CellStore if the filtration is array-backed
+    with stage("cells") as record:
+        if filtration.is_array_backed():
+            cols = homology.get_cell_store([0, 1, 2], filtration)
+        else:
+            cols = homology.get_cells([0, 1, 2], filtration)
+        record.count("cells", len(cols))
     return backend.compute_ph(cols)
 
 
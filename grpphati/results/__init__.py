@@ -1 +1,2 @@
 from .result import Result
+from .reps import RepList
@@ -0,0 +1,222 @@
+import numpy as np
+from bisect import bisect_right
+from collections.abc import Sequence
+from itertools import chain
+from grpphati.columns import CellStore
+
+
+# Representatives that are already lists of columns (or None)
+class _ListSegment:
+    def __init__(self, reps):
+        self.reps = reps
+
+    def __len__(self):
+        return len(self.reps)
+
+    def get(self, idx):
+        return self.reps[idx]
+
+    def masked(self, keep):
+        return _ListSegment(
+            [rep if kept else None for rep, kept in zip(self.reps, keep.tolist())]
+        )
+
+    def can_relabel(self):
+        return all(
+            _can_relabel(col) for rep in self.reps if rep is not None for col in rep
+        )
+
+    def relabel(self, mapping):
+        return _ListSegment(
+            [
+                None if rep is None else [col.relabel(mapping) for col in rep]
+                for rep in self.reps
+            ]
+        )
+
+
+# Representatives stored as compressed index arrays into cols
+# Rep i consists of cols[indices[indptr[i] : indptr[i + 1]]], or is None if missing[i]
+# cols is compacted to the cells referenced by some rep, so that a segment does not keep
+# the whole boundary matrix alive (or pickle it along with a Result)
+class _IndexSegment:
+    def __init__(self, cols, indptr, indices, missing=None):
+        self.cols, self.indices = _compact(cols, indices)
+        self.indptr = indptr
+        self.missing = missing
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def get(self, idx):
+        if self.is_missing(idx):
+            return None
+        return [self.cols[col_idx] for col_idx in self.indices_of(idx).tolist()]
+
+    def is_missing(self, idx):
+        return self.missing is not None and self.missing[idx]
+
+    def indices_of(self, idx):
+        return self.indices[self.indptr[idx] : self.indptr[idx + 1]]
+
+    # Drops the index arrays of the reps that are not kept
+    # The new segment compacts cols to the cells of the kept reps, or drops it if none are kept
+    def masked(self, keep):
+        lengths = np.diff(self.indptr) * keep
+        indptr = np.zeros(len(self) + 1, dtype=np.intp)
+        np.cumsum(lengths, out=indptr[1:])
+        indices = self.indices[np.repeat(keep, np.diff(self.indptr))]
+        missing = ~keep if self.missing is None else (self.missing | ~keep)
+        return _IndexSegment(self.cols, indptr, indices, missing)
+
+    def can_relabel(self):
+        if self.cols is None or isinstance(self.cols, CellStore):
+            return True
+        return all(_can_relabel(col) for col in self.cols)
+
+    def relabel(self, mapping):
+        if self.cols is None:
+            return self
+        if isinstance(self.cols, CellStore):
+            cols = self.cols.relabel(mapping)
+        else:
+            cols = _RelabelledColumns(self.cols, mapping)
+        return _IndexSegment(cols, self.indptr, self.indices, self.missing)
+
+
+# Columns may optionally implement relabel(mapping), returning a relabelled copy
+def _can_relabel(col):
+    return hasattr(col, "relabel")
+
+
+# Returns the cells of cols referenced by indices, with indices re-indexed into them
+# If no cells are referenced then cols is dropped entirely
+def _compact(cols, indices):
+    indices = np.asarray(indices, dtype=np.intp)
+    if cols is None or len(indices) == 0:
+        return (None, indices)
+    used, indices = np.unique(indices, return_inverse=True)
+    if len(used) == len(cols):
+        return (cols, indices.reshape(-1))
+    if isinstance(cols, CellStore):
+        sub_cols = CellStore(
+            cols.nodes, cols.types[used], cols.vertices[used], cols.times[used]
+        )
+    else:
+        sub_cols = [cols[idx] for idx in used.tolist()]
+    return (sub_cols, indices.reshape(-1))
+
+
+# Columns which are relabelled as they are accessed
+class _RelabelledColumns:
+    def __init__(self, cols, mapping):
+        self.cols = cols
+        self.mapping = mapping
+
+    def __len__(self):
+        return len(self.cols)
+
+    def __getitem__(self, idx):
+        return self.cols[idx].relabel(self.mapping)
+
+
+# A sequence of representatives, each of which is a list of columns
+# Reps added via from_indices only build their columns when accessed
+class RepList(Sequence):
+    def __init__(self, reps=()):
+        self._segments = []
+        # _ends[i] is the number of reps in segments 0, ..., i
+        self._ends = []
+        self.extend(reps)
+
+    # Each rep in index_lists is a sequence of indices into cols
+    @classmethod
+    def from_indices(cls, cols, index_lists):
+        index_lists = list(index_lists)
+        lengths = np.fromiter(
+            (len(idxs) for idxs in index_lists), dtype=np.intp, count=len(index_lists)
+        )
+        indptr = np.zeros(len(index_lists) + 1, dtype=np.intp)
+        np.cumsum(lengths, out=indptr[1:])
+        indices = np.fromiter(
+            chain.from_iterable(index_lists), dtype=np.intp, count=indptr[-1]
+        )
+        rep_list = cls()
+        rep_list._add_segment(_IndexSegment(cols, indptr, indices))
+        return rep_list
+
+    def __len__(self):
+        return self._ends[-1] if self._ends else 0
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        segment, local_idx = self._locate(idx)
+        return segment.get(local_idx)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    # Indices of the cells of rep idx within the compact store of its segment,
+    # or None if it was not stored lazily
+    def indices(self, idx):
+        segment, local_idx = self._locate(idx)
+        if isinstance(segment, _IndexSegment) and not segment.is_missing(local_idx):
+            return segment.indices_of(local_idx)
+        return None
+
+    # Returns a new RepList in which reps with keep[i] False are replaced by None
+    def masked(self, keep):
+        keep = np.asarray(keep, dtype=bool)
+        if len(keep) != len(self):
+            raise ValueError("Mask must have one entry per rep")
+        rep_list = RepList()
+        starts = [0] + self._ends[:-1]
+        for segment, start, end in zip(self._segments, starts, self._ends):
+            rep_list._add_segment(segment.masked(keep[start:end]))
+        return rep_list
+
+    # Whether every rep is built from columns that implement relabel
+    def can_relabel(self):
+        return all(segment.can_relabel() for segment in self._segments)
+
+    # Returns a new RepList in which every node v is replaced by mapping[v]
+    def relabelled(self, mapping):
+        rep_list = RepList()
+        for segment in self._segments:
+            rep_list._add_segment(segment.relabel(mapping))
+        return rep_list
+
+    def append(self, rep):
+        if self._segments and isinstance(self._segments[-1], _ListSegment):
+            self._segments[-1].reps.append(rep)
+            self._ends[-1] += 1
+        else:
+            self._add_segment(_ListSegment([rep]))
+
+    def extend(self, reps):
+        if isinstance(reps, RepList):
+            for segment in reps._segments:
+                # Copy list segments, since we may append to them later
+                if isinstance(segment, _ListSegment):
+                    segment = _ListSegment(list(segment.reps))
+                self._add_segment(segment)
+        else:
+            for rep in reps:
+                self.append(rep)
+
+    def _add_segment(self, segment):
+        if len(segment) == 0:
+            return
+        self._segments.append(segment)
+        self._ends.append(len(self) + len(segment))
+
+    def _locate(self, idx):
+        n_reps = len(self)
+        if idx < 0:
+            idx += n_reps
+        if not 0 <= idx < n_reps:
+            raise IndexError("RepList index out of range")
+        segment_idx = bisect_right(self._ends, idx)
+        start = self._ends[segment_idx - 1] if segment_idx > 0 else 0
+        return (self._segments[segment_idx], idx - start)
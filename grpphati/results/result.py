@@ -1,99 +1,289 @@
 import numpy as np
+from grpphati.columns import column_entrance_times, column_dimensions
+from .reps import RepList
 
 
-def _map_to_cols(rep, cols):
-    return [cols[idx] for idx in rep]
+# Reps are kept as indices into cols, and only mapped to columns when accessed
+def _select_reps(reps, bar_idxs, cols):
+    if reps is None:
+        return None
+    return RepList.from_indices(cols, (reps[bar_idx] for bar_idx in bar_idxs.tolist()))
 
 
+def _as_pair_array(pairs):
+    return np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+
+
+# Entrance times and dimensions of every column, as arrays
+def _column_arrays(cols):
+    return (
+        np.asarray(column_entrance_times(cols), dtype=float),
+        np.asarray(column_dimensions(cols)),
+    )
+
+
+# Boolean mask of the bars that have persistence at least threshold and,
+# if top_k is given, are amongst the top_k most persistent (ties broken by order)
+def _rep_retention_mask(persistence, threshold=None, top_k=None):
+    keep = np.ones(len(persistence), dtype=bool)
+    if threshold is not None:
+        keep &= persistence >= threshold
+    if top_k is not None:
+        order = np.argsort(-persistence, kind="stable")
+        keep[order[top_k:]] = False
+    return keep
+
+
+# A barcode (or bar) of result which tells result when it is edited in place
+# root is the barcode containing the bar, so that edits to outdated barcodes are ignored
+class _WatchedList(list):
+    def __init__(self, items, result, root=None):
+        super().__init__(items)
+        self._result = result
+        self._root = self if root is None else root
+
+    # Copies and pickles are plain lists
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def _watch(name):
+    method = getattr(list, name)
+
+    def watched(self, *args, **kwargs):
+        value = method(self, *args, **kwargs)
+        self._result._mark_edited(self._root)
+        return value
+
+    return watched
+
+
+for _name in [
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "sort",
+    "reverse",
+]:
+    setattr(_WatchedList, _name, _watch(_name))
+
+
+# Bars are stored columnwise, in the arrays births and deaths
+# The barcode property provides the list of [birth, death] pairs, which is cached until
+# the bars change; editing that list (or one of its bars) in place updates births and deaths
+# reps is a RepList, so representatives found by a backend are only built on access
 class Result:
-    def __init__(self, barcode=[], reps=[]):
+    def __init__(self, barcode=[], reps=[], profile=None):
         self.barcode = barcode
-        self.reps = reps
+        self.reps = RepList(reps)
+        # Optional grpphati.utils.profiling.Profile, attached by profiled pipelines
+        self.profile = profile
+        # Columns paired off as apparent pairs by the backend, summed over merged results
+        self.n_skipped = 0
+
+    @property
+    def barcode(self):
+        if self._barcode is None:
+            self._barcode = _WatchedList([], self)
+            list.extend(
+                self._barcode,
+                [
+                    _WatchedList(bar, self, self._barcode)
+                    for bar in np.column_stack([self._births, self._deaths]).tolist()
+                ],
+            )
+        return self._barcode
+
+    @barcode.setter
+    def barcode(self, barcode):
+        bars = np.asarray(barcode, dtype=float).reshape(-1, 2)
+        self._births = bars[:, 0].copy()
+        self._deaths = bars[:, 1].copy()
+        self._barcode = None
+        self._edited = False
+
+    @property
+    def births(self):
+        self._sync_edits()
+        return self._births
+
+    @births.setter
+    def births(self, births):
+        self._sync_edits()
+        self._births = births
+        self._barcode = None
+
+    @property
+    def deaths(self):
+        self._sync_edits()
+        return self._deaths
+
+    @deaths.setter
+    def deaths(self, deaths):
+        self._sync_edits()
+        self._deaths = deaths
+        self._barcode = None
+
+    def _mark_edited(self, barcode):
+        if barcode is self._barcode:
+            self._edited = True
+
+    # Reads back the bars from the cached list, if it was edited in place
+    # The list stays cached, and bars added to it are watched from now on
+    def _sync_edits(self):
+        if not self._edited:
+            return
+        bars = np.asarray(self._barcode, dtype=float).reshape(-1, 2)
+        self._births = bars[:, 0].copy()
+        self._deaths = bars[:, 1].copy()
+        for idx, bar in enumerate(self._barcode):
+            if not isinstance(bar, _WatchedList):
+                list.__setitem__(
+                    self._barcode, idx, _WatchedList(bar, self, self._barcode)
+                )
+        self._edited = False
+
+    # The cached list is rebuilt on demand rather than pickled
+    def __getstate__(self):
+        self._sync_edits()
+        state = self.__dict__.copy()
+        state["_barcode"] = None
+        return state
+
+    # Copies the bars and the list of reps, but not the reps themselves
+    def copy(self):
+        result = Result.empty()
+        result.births = self.births.copy()
+        result.deaths = self.deaths.copy()
+        result.reps = RepList(self.reps)
+        result.profile = None if self.profile is None else self.profile.copy()
+        result.n_skipped = self.n_skipped
+        return result
+
+    # Whether relabel is supported by every column in the reps
+    def can_relabel(self):
+        return self.reps.can_relabel()
+
+    # Copies the result, replacing each node v in the reps by mapping[v]
+    def relabel(self, mapping):
+        result = self.copy()
+        result.reps = self.reps.relabelled(mapping)
+        return result
 
     def add_bar(self, bar, with_rep=None):
-        self.barcode.append(bar)
-        self.reps.append(with_rep)
+        self.add_bars([bar[0]], [bar[1]], [with_rep])
+
+    # Appends a bar for each entry of births and deaths, optionally with reps
+    def add_bars(self, births, deaths, reps=None):
+        self.births = np.concatenate([self.births, np.asarray(births, dtype=float)])
+        self.deaths = np.concatenate([self.deaths, np.asarray(deaths, dtype=float)])
+        if reps is None:
+            self.reps.extend([None] * len(births))
+        else:
+            self.reps.extend(reps)
 
     def add_paired(self, pairs, cols, reps=None):
-        for bar_idx, [birth_idx, death_idx] in enumerate(pairs):
-            birth_time = cols[birth_idx].get_entrance_time()
-            death_time = cols[death_idx].get_entrance_time()
-            # Don't add 0 persistence points?
-            if birth_time == death_time:
-                continue
-            dimension = cols[birth_idx].dimension()
-            # Only computing in dimension 1
-            if dimension != 1:
-                continue
-            if reps is not None:
-                self.add_bar(
-                    [birth_time, death_time], _map_to_cols(reps[bar_idx], cols)
-                )
-            else:
-                self.add_bar([birth_time, death_time])
+        pairs = _as_pair_array(pairs)
+        times, dims = _column_arrays(cols)
+        birth_times = times[pairs[:, 0]]
+        death_times = times[pairs[:, 1]]
+        # Don't add 0 persistence points and only computing in dimension 1
+        keep = (birth_times != death_times) & (dims[pairs[:, 0]] == 1)
+        bar_idxs = np.flatnonzero(keep)
+        self.add_bars(
+            birth_times[bar_idxs],
+            death_times[bar_idxs],
+            _select_reps(reps, bar_idxs, cols),
+        )
 
     def add_unpaired(self, pairs, cols, reps=None):
-        all_paired_idxs = [idx for pair in pairs for idx in pair]
-        dim_1_idxs = [idx for idx, col in enumerate(cols) if col.dimension() == 1]
-        unpaired_idxs = [idx for idx in dim_1_idxs if idx not in all_paired_idxs]
-        for bar_idx, idx in enumerate(unpaired_idxs):
-            birth_time = cols[idx].get_entrance_time()
-            if reps is not None:
-                self.add_bar(
-                    [birth_time, np.inf], with_rep=_map_to_cols(reps[bar_idx], cols)
-                )
-            else:
-                self.add_bar([birth_time, np.inf])
+        pairs = _as_pair_array(pairs)
+        times, dims = _column_arrays(cols)
+        is_paired = np.zeros(len(cols), dtype=bool)
+        is_paired[pairs.ravel()] = True
+        unpaired_idxs = np.flatnonzero((dims == 1) & ~is_paired)
+        self.add_bars(
+            times[unpaired_idxs],
+            np.full(len(unpaired_idxs), np.inf),
+            _select_reps(reps, np.arange(len(unpaired_idxs)), cols),
+        )
 
     def add_unpaired_raw(self, unpaired_idxs, cols, reps=None):
-        for bar_idx, idx in enumerate(unpaired_idxs):
-            if cols[idx].dimension() != 1:
-                continue
-            birth_time = cols[idx].get_entrance_time()
-            if reps is not None:
-                self.add_bar(
-                    [birth_time, np.inf], with_rep=_map_to_cols(reps[bar_idx], cols)
-                )
-            else:
-                self.add_bar([birth_time, np.inf])
+        unpaired_idxs = np.asarray(unpaired_idxs, dtype=np.intp)
+        times, dims = _column_arrays(cols)
+        bar_idxs = np.flatnonzero(dims[unpaired_idxs] == 1)
+        self.add_bars(
+            times[unpaired_idxs[bar_idxs]],
+            np.full(len(bar_idxs), np.inf),
+            _select_reps(reps, bar_idxs, cols),
+        )
+
+    def persistence(self):
+        return self.deaths - self.births
+
+    # Discards the reps of all but the bars with persistence at least threshold
+    # and, if top_k is given, amongst the top_k most persistent bars
+    # Discarded reps are replaced by None
+    def retain_reps(self, threshold=None, top_k=None):
+        keep = _rep_retention_mask(self.persistence(), threshold, top_k)
+        self.reps = self.reps.masked(keep)
 
     def extend(self, other_result):
-        self.barcode.extend(other_result.barcode)
-        self.reps.extend(other_result.reps)
+        self.add_bars(other_result.births, other_result.deaths, other_result.reps)
+        self._merge_profile(other_result)
+        self.n_skipped += other_result.n_skipped
+
+    def _merge_profile(self, other_result):
+        if other_result.profile is None:
+            return
+        if self.profile is None:
+            self.profile = other_result.profile.copy()
+        else:
+            self.profile.extend(other_result.profile)
 
     def num_features(self):
-        return len(self.barcode)
+        return len(self.deaths)
 
     def num_infinite_features(self):
-        return len([True for bar in self.barcode if bar[1] == np.inf])
+        return int(np.count_nonzero(self.deaths == np.inf))
 
     def num_finite_features(self):
-        return len([True for bar in self.barcode if np.isfinite(bar[1])])
+        return int(np.count_nonzero(np.isfinite(self.deaths)))
 
     def max_finite_feature(self):
-        try:
-            return max(bar[1] for bar in self.barcode if np.isfinite(bar[1]))
-        except ValueError:
-            return None
+        finite_deaths = self.deaths[np.isfinite(self.deaths)]
+        return float(finite_deaths.max()) if len(finite_deaths) > 0 else None
 
     def min_finite_feature(self):
-        try:
-            return min(bar[1] for bar in self.barcode if np.isfinite(bar[1]))
-        except ValueError:
-            return None
+        finite_deaths = self.deaths[np.isfinite(self.deaths)]
+        return float(finite_deaths.min()) if len(finite_deaths) > 0 else None
 
+    # Number of bars that have not died by each x in x_range
     def compute_betti_curve(self, x_range):
-        n_features = self.num_features()
-        return [
-            n_features - len([True for bar in self.barcode if bar[1] <= x])
-            for x in x_range
-        ]
+        sorted_deaths = np.sort(self.deaths)
+        n_died = np.searchsorted(sorted_deaths, np.asarray(x_range), side="right")
+        return (self.num_features() - n_died).tolist()
 
+    # Merges into the first result, concatenating all bars at once
     @staticmethod
     def merge(*results):
         ret_val = results[0]
-        for i in range(1, len(results)):
-            ret_val.extend(results[i])
+        others = results[1:]
+        if len(others) == 0:
+            return ret_val
+        ret_val.births = np.concatenate([ret_val.births] + [r.births for r in others])
+        ret_val.deaths = np.concatenate([ret_val.deaths] + [r.deaths for r in others])
+        for other in others:
+            ret_val.reps.extend(other.reps)
+            ret_val._merge_profile(other)
+            ret_val.n_skipped += other.n_skipped
         return ret_val
 
     @classmethod
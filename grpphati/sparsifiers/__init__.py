@@ -1,3 +1,4 @@
 from .abstract import Sparsifier
 from .list import ListSparsifier
 from .generator import GeneratorSparsifier
+from .csc import CSCSparsifier, CSCMatrix
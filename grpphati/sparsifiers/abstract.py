@@ -13,3 +13,13 @@ class Sparsifier(ABC):
             idx = col2idx_map[col]
             sparse_bdry.append(idx)
         return sorted(sparse_bdry)
+
+    # Boundaries of a CellStore are computed in bulk, without building any columns
+    @staticmethod
+    def _iter_store(store, return_dimension):
+        indptr, indices = store.boundaries()
+        for idx, dimension in enumerate(store.dimensions().tolist()):
+            sparse_bdry = indices[indptr[idx] : indptr[idx + 1]].tolist()
+            if return_dimension:
+                sparse_bdry = (dimension, sparse_bdry)
+            yield sparse_bdry
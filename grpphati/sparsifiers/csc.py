@@ -0,0 +1,60 @@
+import numpy as np
+from collections import namedtuple
+from .abstract import Sparsifier
+from grpphati.columns import CellStore
+
+
+# Boundary matrix in compressed sparse column format
+# The boundary of column j is indices[indptr[j]:indptr[j + 1]] and its dimension is dims[j]
+class CSCMatrix(namedtuple("CSCMatrix", ["indptr", "indices", "dims"])):
+    def n_cols(self):
+        return len(self.dims)
+
+    # Yields each column as a list, in the format produced by ListSparsifier
+    def iter_columns(self, return_dimension=True):
+        indices = self.indices.tolist()
+        indptr = self.indptr.tolist()
+        for idx, dimension in enumerate(self.dims.tolist()):
+            sparse_bdry = indices[indptr[idx] : indptr[idx + 1]]
+            if return_dimension:
+                sparse_bdry = (dimension, sparse_bdry)
+            yield sparse_bdry
+
+    def append_empty_column(self, dimension):
+        return CSCMatrix(
+            np.append(self.indptr, self.indptr[-1]),
+            self.indices,
+            np.append(self.dims, dimension),
+        )
+
+    @classmethod
+    def from_columns(cls, sparse_cols, dims):
+        indptr = np.zeros(len(sparse_cols) + 1, dtype=np.intp)
+        np.cumsum([len(sparse_col) for sparse_col in sparse_cols], out=indptr[1:])
+        indices = np.fromiter(
+            (row for sparse_col in sparse_cols for row in sparse_col),
+            dtype=np.intp,
+            count=indptr[-1],
+        )
+        return cls(indptr, indices, np.asarray(dims, dtype=np.intp))
+
+
+class CSCSparsifier(Sparsifier):
+    def __call__(self, cols):
+        if isinstance(cols, CellStore):
+            indptr, indices = cols.boundaries()
+            return CSCMatrix(indptr, indices, cols.dimensions())
+        indptr = [0]
+        indices = []
+        dims = []
+        col2idx_map = {}
+        for idx, col in enumerate(cols):
+            indices.extend(Sparsifier._sparsify(col.boundary(), col2idx_map))
+            indptr.append(len(indices))
+            dims.append(col.dimension())
+            col2idx_map[col] = idx
+        return CSCMatrix(
+            np.array(indptr, dtype=np.intp),
+            np.array(indices, dtype=np.intp),
+            np.array(dims, dtype=np.intp),
+        )
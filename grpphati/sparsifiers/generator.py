@@ -1,4 +1,5 @@
 from .abstract import Sparsifier
+from grpphati.columns import CellStore
 
 
 class GeneratorSparsifier(Sparsifier):
@@ -9,12 +10,18 @@ class GeneratorSparsifier(Sparsifier):
         return self
 
     def __call__(self, col_iter):
-        self.col_iter = col_iter
+        if isinstance(col_iter, CellStore):
+            self.store_iter = Sparsifier._iter_store(col_iter, self.return_dimension)
+            return self
+        self.store_iter = None
+        self.col_iter = iter(col_iter)
         self.next_insertion_idx = 0
         self.col2idx_map = {}
         return self
 
     def __next__(self):
+        if self.store_iter is not None:
+            return next(self.store_iter)
         col = next(self.col_iter)
         bdry = col.boundary()
         sparse_bdry = Sparsifier._sparsify(bdry, self.col2idx_map)
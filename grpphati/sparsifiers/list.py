@@ -1,4 +1,5 @@
 from .abstract import Sparsifier
+from grpphati.columns import CellStore
 
 
 class ListSparsifier(Sparsifier):
@@ -6,6 +7,8 @@ class ListSparsifier(Sparsifier):
         self.return_dimension = return_dimension
 
     def __call__(self, cols):
+        if isinstance(cols, CellStore):
+            return list(Sparsifier._iter_store(cols, self.return_dimension))
         sparse_cols = []
         col2idx_map = {}
         for col in cols:
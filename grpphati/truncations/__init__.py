@@ -3,6 +3,8 @@ import numpy as np
 
 # Returns the time at which a directed cone appears (a node pointing to all nodes / from all nodes)
 def cone_time(filtration, grounded: bool):
+    if filtration.is_array_backed():
+        return _array_cone_time(filtration, grounded)
     nodes = [node for node, _node_t in filtration.node_iter()]
     trunc_time = np.inf
     edge_dict = filtration.edge_dict()
@@ -10,8 +12,8 @@ def cone_time(filtration, grounded: bool):
     for source, distances in edge_dict.items():
         # Check if source has a path to every other node
         if all(node in distances.keys() for node in nodes if node != source):
-            # Then we can truncate at max time
-            proposed_time = max(t for t in distances.values())
+            # Then we can truncate at max time (a lone node is a cone from the start)
+            proposed_time = max(distances.values(), default=0)
             trunc_time = min(trunc_time, proposed_time)
     # Computing incoming cone
     for node in nodes:
@@ -24,12 +26,38 @@ def cone_time(filtration, grounded: bool):
         if all(other_node in sources for other_node in nodes if other_node != node):
             # Then we can truncate at max time
             proposed_time = max(
-                distances[node] for distances in edge_dict.values() if node in distances
+                (
+                    distances[node]
+                    for distances in edge_dict.values()
+                    if node in distances
+                ),
+                default=0,
             )
             trunc_time = min(trunc_time, proposed_time)
     if grounded:
         # Need to wait for all underlying edges to appear if grounded
-        max_edge_time = max(t for _edge, t in filtration.edge_iter())
+        max_edge_time = max((t for _edge, t in filtration.edge_iter()), default=0)
+        return max(max_edge_time, trunc_time)
+    else:
+        return trunc_time
+
+
+def _array_cone_time(filtration, grounded: bool):
+    distances = filtration.distance_matrix()
+    if distances.shape[0] < 2:
+        return np.inf
+    # A row (resp. column) with no infinite off-diagonal entry is an outgoing (resp. incoming) cone
+    outgoing = _off_diagonal(distances).max(axis=1)
+    incoming = _off_diagonal(distances.T).max(axis=1)
+    trunc_time = min(outgoing.min(), incoming.min())
+    if grounded:
+        # Need to wait for all underlying edges to appear if grounded
+        max_edge_time = distances[np.isfinite(distances)].max(initial=-np.inf)
         return max(max_edge_time, trunc_time)
     else:
         return trunc_time
+
+
+def _off_diagonal(matrix):
+    n = matrix.shape[0]
+    return matrix[~np.eye(n, dtype=bool)].reshape(n, n - 1)
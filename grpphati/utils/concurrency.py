@@ -0,0 +1,57 @@
+import threading
+from contextlib import contextmanager
+from joblib import cpu_count
+
+# The active budget is thread-local, so that thread-based workers can each hold their share
+_state = threading.local()
+
+
+# A number of threads to be shared between nested parallel layers
+# An outer layer claims some workers and each worker gets an equal share of the rest,
+# so that inner layers (e.g. the LoPHAT backend) do not oversubscribe the machine
+class ConcurrencyBudget:
+    def __init__(self, n_threads=None):
+        self.n_threads = cpu_count() if n_threads is None else max(1, n_threads)
+
+    # Number of workers a layer asking for n_jobs may start for n_tasks tasks
+    # Negative n_jobs are relative to the budget, as in joblib (-1 means all of it)
+    def workers(self, n_jobs=-1, n_tasks=None):
+        if n_jobs is None:
+            n_jobs = 1
+        n_workers = self.n_threads + 1 + n_jobs if n_jobs < 0 else n_jobs
+        n_workers = min(n_workers, self.n_threads)
+        if n_tasks is not None:
+            n_workers = min(n_workers, n_tasks)
+        return max(1, n_workers)
+
+    # The budget available to each of n_workers workers
+    def share(self, n_workers):
+        return ConcurrencyBudget(self.n_threads // max(1, n_workers))
+
+    # Makes this the current budget in this thread for the duration of the block
+    @contextmanager
+    def active(self):
+        previous = getattr(_state, "budget", None)
+        _state.budget = self
+        try:
+            yield self
+        finally:
+            _state.budget = previous
+
+    def __repr__(self):
+        return f"ConcurrencyBudget({self.n_threads})"
+
+
+# The active budget, or the whole machine if there is none
+def current_budget():
+    budget = getattr(_state, "budget", None)
+    return ConcurrencyBudget() if budget is None else budget
+
+
+# Wraps a pipeline so that it runs under budget
+def budgeted(pipeline, budget):
+    def new_pipeline(G):
+        with budget.active():
+            return pipeline(G)
+
+    return new_pipeline
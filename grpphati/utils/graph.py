@@ -1,45 +1,85 @@
 import networkx as nx
+import warnings
+from collections import deque
+from itertools import chain
 
 
+# Repeatedly removes nodes of (in + out) degree at most 1, using a work queue
+# Returns G itself if there is nothing to remove, otherwise a single subgraph view of G
 def without_appendages(G):
-    smaller_G = G
-    while True:
-        internal_nodes = [node for node, degree in smaller_G.degree if degree > 1]
-        if len(internal_nodes) == smaller_G.number_of_nodes():
-            break
-        # We take subview of G to avoid nested restricted_views
-        smaller_G = G.subgraph(internal_nodes)
-    return smaller_G
+    degree = dict(G.degree)
+    queue = deque(node for node, node_degree in degree.items() if node_degree <= 1)
+    removed = set(queue)
+    while queue:
+        node = queue.popleft()
+        for neighbor in chain(G.successors(node), G.predecessors(node)):
+            if neighbor in removed:
+                continue
+            degree[neighbor] -= 1
+            if degree[neighbor] <= 1:
+                removed.add(neighbor)
+                queue.append(neighbor)
+    if not removed:
+        return G
+    return G.subgraph(node for node in G.nodes if node not in removed)
 
 
-# TODO: Find wedge in parallel? Is there a more efficient algorithm?
 # Assumes G is weakly connected
 # Returns appendage-thinned wedge components
+# These are the blocks (biconnected components) of the underlying undirected graph
+# Blocks consisting of a single directed edge are appendages, so they are thinned away
+# Self-loops are ignored, so callers should treat them separately (see parallel_over_wedges)
 def wedge_components(G, starting=None):
-    starting_subgraph = G if starting is None else G.subgraph(starting)
-    # Remove appendages
-    subgraph = without_appendages(starting_subgraph)
-    # Check for null graph
-    if subgraph.number_of_edges() == 0:
-        return []
-    for node in subgraph.nodes:
-        without_node = nx.restricted_view(subgraph, [node], [])
-        # Have to check without_node is note a null graph
-        # For example without_node might be a double edge graph
-        is_wedge = (without_node.number_of_edges() != 0) and not nx.is_weakly_connected(
-            without_node
-        )
-        if is_wedge:
-            wedge_comps = [
-                comp | {node} for comp in nx.weakly_connected_components(without_node)
-            ]
-            # We iterated on wedge components found at this vertex
-            # We pass on G to avoid nested subviews
-            return (
-                subcomp
-                for comp in wedge_comps
-                for subcomp in wedge_components(G, starting=comp)
+    subgraph = G if starting is None else G.subgraph(starting)
+    blocks = nx.biconnected_components(subgraph.to_undirected(as_view=True))
+    return [block for block in blocks if not _is_single_edge(subgraph, block)]
+
+
+def _is_single_edge(G, block):
+    if len(block) > 2:
+        return False
+    u, v = block
+    return not (G.has_edge(u, v) and G.has_edge(v, u))
+
+
+# Groups the components of G into isomorphism classes of weighted digraphs
+# Returns a list of representative component indexes, and for each component
+# its class and a mapping from the nodes of the representative to the component
+# Components are bucketed by a Weisfeiler-Lehman hash, and isomorphism is only
+# checked within a bucket
+def isomorphism_classes(G, components, weight="weight"):
+    edge_match = lambda data_1, data_2: data_1.get(weight, 1) == data_2.get(weight, 1)
+    representatives = []
+    membership = []
+    buckets = {}
+    for idx, component in enumerate(components):
+        subgraph = G.subgraph(component)
+        bucket = buckets.setdefault(_invariant_hash(subgraph, weight), [])
+        for class_idx in bucket:
+            matcher = nx.algorithms.isomorphism.DiGraphMatcher(
+                G.subgraph(components[representatives[class_idx]]),
+                subgraph,
+                edge_match=edge_match,
             )
-    # No wedge found, so the only wedge component is all of the nodes
-    # We have to return as an iterator with one list
-    return [starting]
+            if matcher.is_isomorphic():
+                membership.append((class_idx, matcher.mapping))
+                break
+        else:
+            bucket.append(len(representatives))
+            membership.append((len(representatives), None))
+            representatives.append(idx)
+    return (representatives, membership)
+
+
+def _invariant_hash(G, weight):
+    labelled = nx.DiGraph()
+    labelled.add_nodes_from(G.nodes)
+    labelled.add_edges_from(
+        (u, v, {"weight": repr(float(data.get(weight, 1)))})
+        for u, v, data in G.edges(data=True)
+    )
+    # Hashes are only compared within a single run, so changes between versions are harmless
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        wl_hash = nx.weisfeiler_lehman_graph_hash(labelled, edge_attr="weight")
+    return (G.number_of_nodes(), G.number_of_edges(), wl_hash)
@@ -0,0 +1,99 @@
+import importlib
+import threading
+from concurrent.futures import FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from itertools import islice
+from joblib import cpu_count
+from joblib.externals.loky import ProcessPoolExecutor
+
+# The active pool is thread-local, like the active profile and budget
+_state = threading.local()
+
+# Imported by each worker as it starts, so that the first task does not pay for them
+DEFAULT_MODULES = (
+    "numpy",
+    "networkx",
+    "grpphati.pipelines.grounded",
+    "grpphati.pipelines.standard",
+    "grpphati.optimisations.dispatch",
+)
+
+
+# A pool of worker processes which stays alive, with modules imported, across pipeline calls
+# Pass it to make_grounded_pipeline or make_standard_pipeline as executor=pool,
+# and the parallel optimisations will send their tasks to it instead of joblib.Parallel
+# Call shutdown (or use as a context manager) once the pool is no longer needed
+class WorkerPool:
+    def __init__(self, n_workers=None, modules=DEFAULT_MODULES):
+        self.n_workers = cpu_count() if n_workers is None else max(1, n_workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            initializer=_import_modules,
+            initargs=(tuple(modules),),
+        )
+        # Start the workers now, rather than during the first call
+        list(self._executor.map(_is_ready, range(self.n_workers)))
+
+    # Returns a concurrent.futures.Future for fn(*args)
+    def submit(self, fn, *args):
+        return self._executor.submit(fn, *args)
+
+    # Like the builtin map, but returns a list
+    # If max_pending is given, at most that many calls are submitted to the pool at once
+    def map(self, fn, *iterables, max_pending=None):
+        if max_pending is None:
+            return list(self._executor.map(fn, *iterables))
+        calls = iter(zip(*iterables))
+        futures = []
+        pending = set()
+        while True:
+            for args in islice(calls, max(0, max_pending - len(pending))):
+                futures.append(self._executor.submit(fn, *args))
+                pending.add(futures[-1])
+            if not pending:
+                return [future.result() for future in futures]
+            _, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    # Makes this the current pool in this thread for the duration of the block
+    @contextmanager
+    def active(self):
+        previous = getattr(_state, "pool", None)
+        _state.pool = self
+        try:
+            yield self
+        finally:
+            _state.pool = previous
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def __repr__(self):
+        return f"WorkerPool({self.n_workers})"
+
+
+def current_pool():
+    return getattr(_state, "pool", None)
+
+
+# Wraps a pipeline so that its parallel optimisations run on pool
+def pooled(pipeline, pool):
+    def new_pipeline(G):
+        with pool.active():
+            return pipeline(G)
+
+    return new_pipeline
+
+
+def _import_modules(modules):
+    for module in modules:
+        importlib.import_module(module)
+
+
+def _is_ready(_):
+    return True
@@ -0,0 +1,146 @@
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    _has_resource = False
+else:
+    _has_resource = True
+
+# The active profile is thread-local, so concurrent pipelines do not share records
+_state = threading.local()
+
+
+# Timing, peak memory growth and counts for a single run of a named stage
+class StageRecord:
+    def __init__(self, name, wall_time=0.0, rss_delta=0, counts=None):
+        self.name = name
+        self.wall_time = wall_time
+        self.rss_delta = rss_delta
+        self.counts = {} if counts is None else counts
+
+    def count(self, key, value):
+        self.counts[key] = self.counts.get(key, 0) + value
+
+    def __repr__(self):
+        return (
+            f"StageRecord({self.name!r}, wall_time={self.wall_time:.6f}, "
+            f"rss_delta={self.rss_delta}, counts={self.counts})"
+        )
+
+
+# Stage records are discarded when there is no active profile
+class _NullRecord(StageRecord):
+    def count(self, key, value):
+        pass
+
+
+# A list of stage records, in the order the stages finished
+class Profile:
+    def __init__(self, records=None):
+        self.records = [] if records is None else records
+
+    def add(self, record):
+        self.records.append(record)
+
+    def extend(self, other):
+        self.records.extend(other.records)
+
+    def copy(self):
+        return Profile(list(self.records))
+
+    # Aggregates records by stage name, in order of first appearance
+    # Wall times and counts are summed, rss_delta is the largest seen for that stage
+    def summary(self):
+        stages = {}
+        for record in self.records:
+            stage = stages.setdefault(
+                record.name,
+                {"calls": 0, "wall_time": 0.0, "rss_delta": 0, "counts": {}},
+            )
+            stage["calls"] += 1
+            stage["wall_time"] += record.wall_time
+            stage["rss_delta"] = max(stage["rss_delta"], record.rss_delta)
+            for key, value in record.counts.items():
+                stage["counts"][key] = stage["counts"].get(key, 0) + value
+        return stages
+
+    def total_time(self, name):
+        return sum(record.wall_time for record in self.records if record.name == name)
+
+    def __repr__(self):
+        lines = [f"Profile with {len(self.records)} records"]
+        for name, stage in self.summary().items():
+            lines.append(
+                f"  {name}: {stage['calls']} calls, {stage['wall_time']:.6f}s, "
+                f"rss +{stage['rss_delta']}B, {stage['counts']}"
+            )
+        return "\n".join(lines)
+
+
+def current_profile():
+    return getattr(_state, "profile", None)
+
+
+def is_profiling():
+    return current_profile() is not None
+
+
+# Activates a fresh profile in this thread for the duration of the block
+# Any previously active profile is restored afterwards
+@contextmanager
+def profiling():
+    previous = current_profile()
+    profile = Profile()
+    _state.profile = profile
+    try:
+        yield profile
+    finally:
+        _state.profile = previous
+
+
+# Records a stage into the active profile, if there is one
+# Yields a StageRecord so that the caller can attach counts
+@contextmanager
+def stage(name):
+    profile = current_profile()
+    if profile is None:
+        yield _NullRecord(name)
+        return
+    record = StageRecord(name)
+    rss_before = _peak_rss()
+    tic = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.wall_time = time.perf_counter() - tic
+        record.rss_delta = _peak_rss() - rss_before
+        profile.add(record)
+
+
+# Wraps a pipeline so that it runs under a fresh profile, recording the whole run as name
+# The profile is attached to the returned Result, together with any profiles
+# that were attached to sub-results (e.g. by workers in parallel_over_components)
+def profiled(pipeline, name="total"):
+    def new_pipeline(G):
+        with profiling() as profile:
+            with stage(name):
+                result = pipeline(G)
+        if result.profile is not None:
+            profile.extend(result.profile)
+        result.profile = profile
+        return result
+
+    return new_pipeline
+
+
+# Peak resident set size of this process, in bytes
+def _peak_rss():
+    if not _has_resource:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,83 @@
+import numpy as np
+
+
+# Finds every two-path s -> m -> t with finite hops in a distance matrix, as in ArrayFiltration
+# Returns columnar arrays (sources, midpoints, targets, hop_times, shortcut_times)
+# where hop_times = max(d(s, m), d(m, t)) and shortcut_times = d(s, t)
+# Double edges (s == t) are only included if include_double_edges
+# If require_shortcut then two-paths with d(s, t) = inf are skipped (except double edges)
+# If source_mask or target_mask are given (boolean arrays over nodes) then only two-paths
+# with source_mask[s] or target_mask[t] are returned
+def two_path_arrays(
+    distances,
+    include_double_edges=True,
+    require_shortcut=False,
+    source_mask=None,
+    target_mask=None,
+):
+    if source_mask is not None or target_mask is not None:
+        n_nodes = distances.shape[0]
+        no_nodes = np.zeros(n_nodes, dtype=bool)
+        source_mask = no_nodes if source_mask is None else source_mask
+        target_mask = no_nodes if target_mask is None else target_mask
+    chunks = [
+        _two_paths_through(
+            distances,
+            midpoint,
+            include_double_edges,
+            require_shortcut,
+            source_mask,
+            target_mask,
+        )
+        for midpoint in range(distances.shape[0])
+    ]
+    if len(chunks) == 0:
+        return _empty_two_paths()
+    return tuple(np.concatenate(arrays) for arrays in zip(*chunks))
+
+
+# Each midpoint contributes the product of its finite in-distances and out-distances
+# With masks, this is restricted to (masked sources x targets) + (other sources x masked targets)
+def _two_paths_through(
+    distances,
+    midpoint,
+    include_double_edges,
+    require_shortcut,
+    source_mask=None,
+    target_mask=None,
+):
+    sources = np.flatnonzero(np.isfinite(distances[:, midpoint]))
+    targets = np.flatnonzero(np.isfinite(distances[midpoint]))
+    if source_mask is None:
+        sources, targets = _product(sources, targets)
+    else:
+        is_masked = source_mask[sources]
+        masked_sources, masked_targets = _product(sources[is_masked], targets)
+        other_sources, other_targets = _product(
+            sources[~is_masked], targets[target_mask[targets]]
+        )
+        sources = np.concatenate([masked_sources, other_sources])
+        targets = np.concatenate([masked_targets, other_targets])
+    shortcut_times = distances[sources, targets]
+    is_double_edge = sources == targets
+    if require_shortcut:
+        keep = np.isfinite(shortcut_times)
+    else:
+        keep = ~is_double_edge
+    if include_double_edges:
+        keep |= is_double_edge
+    sources = sources[keep]
+    targets = targets[keep]
+    hop_times = np.maximum(distances[sources, midpoint], distances[midpoint, targets])
+    midpoints = np.full(len(sources), midpoint)
+    return (sources, midpoints, targets, hop_times, shortcut_times[keep])
+
+
+def _product(sources, targets):
+    return (np.repeat(sources, len(targets)), np.tile(targets, len(sources)))
+
+
+def _empty_two_paths():
+    empty_idxs = np.empty(0, dtype=np.intp)
+    empty_times = np.empty(0)
+    return (empty_idxs, empty_idxs, empty_idxs, empty_times, empty_times)
@@ -25,6 +25,20 @@ builder = graph_builder(
     connected=True,
 )
 
+# As builder, but grounding graphs may have self-loops, which create essential 1-cycles
+loop_builder = graph_builder(
+    graph_type=nx.DiGraph,
+    node_keys=None,
+    node_data=_node_data,
+    edge_data=_edge_data,
+    min_nodes=2,
+    max_nodes=30,
+    min_edges=1,
+    max_edges=None,
+    self_loops=True,
+    connected=True,
+)
+
 
 def report_graph_size(test):
     def new_test(**args):
@@ -0,0 +1,71 @@
+import networkx as nx
+from grpphati.columns import Column
+from grpphati.filtrations import ShortestPathFiltration
+from grpphati.homologies import RegularPathHomology
+from grpphati.optimisations import check_empty, dispatch, parallel_over_components
+from grpphati.optimisations.cache import ResultCache
+from grpphati.optimisations.dispatch import run_over_components
+from grpphati.pipelines.grounded import make_grounded_pipeline
+from grpphati.results import Result
+
+
+# A column type which does not implement relabel
+class _NodesCol(Column):
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.entrance_time = 0
+
+    def __repr__(self):
+        return f"_NodesCol({self.nodes})"
+
+    def __eq__(self, other):
+        return isinstance(other, _NodesCol) and self.nodes == other.nodes
+
+    def __hash__(self):
+        return hash(self.nodes)
+
+    def dimension(self):
+        return 1
+
+    def boundary(self):
+        return []
+
+
+def _nodes_pipeline(G):
+    return Result(barcode=[[0, 1]], reps=[[_NodesCol(tuple(sorted(G.nodes)))]])
+
+
+def test_deduplicate_without_relabel():
+    G = nx.disjoint_union_all([nx.cycle_graph(3, create_using=nx.DiGraph)] * 3)
+    components = list(nx.weakly_connected_components(G))
+    result = run_over_components(
+        _nodes_pipeline, G, components, n_jobs=1, deduplicate=True
+    )
+    # Each copy is computed directly, so every rep is on its own nodes
+    rep_nodes = sorted(rep[0].nodes for rep in result.reps)
+    assert rep_nodes == [(0, 1, 2), (3, 4, 5), (6, 7, 8)]
+
+
+def test_cache_hits_carry_no_profile(monkeypatch):
+    # Send every component to a worker, which attaches its own profile
+    monkeypatch.setattr(dispatch, "INLINE_COST", 0)
+    monkeypatch.setattr(dispatch, "BATCH_COST", 0)
+    cache = ResultCache()
+    pipeline = make_grounded_pipeline(
+        ShortestPathFiltration,
+        RegularPathHomology,
+        optimisation_strat=lambda pipeline: parallel_over_components(
+            check_empty(pipeline), n_jobs=2, prefer="threads", cache=cache
+        ),
+        profile=True,
+    )
+    G = nx.disjoint_union_all(
+        [nx.gnp_random_graph(8, 0.3, seed=seed, directed=True) for seed in range(3)]
+    )
+    first = pipeline(G).profile.summary()
+    second = pipeline(G).profile.summary()
+    assert first["component"]["calls"] == 3
+    assert "cache_hit" not in first
+    # Every component is a hit, so no stage of the first run is repeated
+    assert "component" not in second
+    assert second["cache_hit"]["calls"] == 3
@@ -0,0 +1,105 @@
+import time
+import networkx as nx
+import pytest
+from .utils import grounded_barcodes_equal, rep_faces
+from grpphati.pipelines.grounded import make_grounded_pipeline, GrPPH
+from grpphati.pipelines.batch import run_batch
+from grpphati.homologies import RegularPathHomology
+from grpphati.filtrations import ShortestPathFiltration
+from grpphati.optimisations import parallel_over_components, check_empty, dispatch
+from grpphati.optimisations.dispatch import run_over_components
+from grpphati.results import Result
+from grpphati.utils.concurrency import ConcurrencyBudget
+from grpphati.utils.pool import WorkerPool
+
+unoptimised_GrPPH = make_grounded_pipeline(
+    ShortestPathFiltration, RegularPathHomology, optimisation_strat=None
+)
+
+
+# Records when it ran as the only bar of its barcode
+def _timed_pipeline(G):
+    start = time.time()
+    time.sleep(0.2)
+    return Result(barcode=[[start, time.time()]])
+
+
+def test_worker_pool_agrees(monkeypatch):
+    # Send every component to the pool, however small
+    monkeypatch.setattr(dispatch, "INLINE_COST", 0)
+    monkeypatch.setattr(dispatch, "BATCH_COST", 0)
+    G = nx.disjoint_union_all(
+        [nx.gnp_random_graph(8, 0.3, seed=seed, directed=True) for seed in range(4)]
+    )
+    barcode = unoptimised_GrPPH(G).barcode
+    with WorkerPool(2) as pool:
+        pooled_GrPPH = make_grounded_pipeline(
+            ShortestPathFiltration,
+            RegularPathHomology,
+            optimisation_strat=lambda pipeline: parallel_over_components(
+                check_empty(pipeline)
+            ),
+            executor=pool,
+        )
+        # The second call reuses the same workers
+        for _ in range(2):
+            result = pooled_GrPPH(G)
+            assert grounded_barcodes_equal(result.barcode, barcode)
+            for rep in result.reps:
+                assert all(face.node in G for face in rep_faces(rep))
+
+
+def test_worker_pool_respects_budget(monkeypatch):
+    monkeypatch.setattr(dispatch, "INLINE_COST", 0)
+    monkeypatch.setattr(dispatch, "BATCH_COST", 0)
+    G = nx.disjoint_union_all([nx.path_graph(2, create_using=nx.DiGraph)] * 4)
+    components = list(nx.weakly_connected_components(G))
+    with WorkerPool(4) as pool, pool.active(), ConcurrencyBudget(1).active():
+        result = run_over_components(_timed_pipeline, G, components)
+    # A budget of one thread runs the tasks one at a time, despite the larger pool
+    bars = sorted(result.barcode)
+    assert len(bars) == 4
+    for (_, end), (start, _) in zip(bars, bars[1:]):
+        assert end <= start
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_run_batch_agrees(ordered):
+    graphs = [
+        nx.gnp_random_graph(8, 0.3, seed=seed, directed=True) for seed in range(6)
+    ]
+    with WorkerPool(2) as pool:
+        items = list(
+            run_batch(
+                GrPPH, iter(graphs), executor=pool, ordered=ordered, max_pending=3
+            )
+        )
+    if ordered:
+        assert [item.index for item in items] == list(range(len(graphs)))
+    assert sorted(item.index for item in items) == list(range(len(graphs)))
+    for item in items:
+        assert item.wall_time >= 0
+        assert grounded_barcodes_equal(
+            item.result.barcode, unoptimised_GrPPH(graphs[item.index]).barcode
+        )
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_run_batch_respects_budget(ordered):
+    graphs = [nx.path_graph(2, create_using=nx.DiGraph)] * 4
+    with WorkerPool(4) as pool, ConcurrencyBudget(1).active():
+        items = list(run_batch(_timed_pipeline, graphs, executor=pool, ordered=ordered))
+    # The pool has room for every graph, but the budget runs them one at a time
+    bars = sorted(bar for item in items for bar in item.result.barcode)
+    assert len(bars) == 4
+    for (_, end), (start, _) in zip(bars, bars[1:]):
+        assert end <= start
+
+
+def test_run_batch_rejects_empty_window():
+    graphs = [nx.path_graph(2, create_using=nx.DiGraph)] * 3
+    with WorkerPool(2) as pool, ConcurrencyBudget(2).active():
+        with pytest.raises(ValueError):
+            list(run_batch(GrPPH, graphs, executor=pool, max_pending=0))
+    with pytest.raises(ValueError):
+        list(run_batch(GrPPH, graphs, n_jobs=1, max_pending=-1))
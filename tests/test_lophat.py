@@ -1,5 +1,6 @@
 import networkx as nx
 import numpy as np
+import pickle
 from grpphati.filtrations.shortest_path import ShortestPathFiltration
 from grpphati.homologies.directed_flag import DirectedFlagComplexHomology
 from grpphati.homologies.path_homology import RegularPathHomology
@@ -9,7 +10,8 @@ from grpphati.optimisations.composite import (
 )
 from grpphati.pipelines.grounded import make_grounded_pipeline
 from grpphati.backends import LoPHATBackend
-from .utils import grounded_barcodes_equal
+from grpphati.results import Result
+from .utils import grounded_barcodes_equal, is_cycle
 
 GrPPH = make_grounded_pipeline(
     ShortestPathFiltration,
@@ -229,3 +231,93 @@ def test_collapsing_ls_GrPdFlH():
     G = _collapsing_ls_graph()
     barcode = GrPdFlH(G).barcode
     assert grounded_barcodes_equal(barcode, [[0, 13]])
+
+
+def test_reps_are_cycles():
+    G = _collapsing_ls_graph()
+    G.add_edge(3, 0, weight=1)
+    result = GrPPH(G)
+    assert len(result.reps) == len(result.barcode)
+    for idx, rep in enumerate(result.reps):
+        assert len(rep) == len(result.reps.indices(idx))
+        assert is_cycle(rep)
+
+
+# Reps should only keep the cells they use, not the whole boundary matrix
+def test_reps_reference_compact_store():
+    G = nx.gnp_random_graph(30, 0.1, seed=1, directed=True)
+    result = GrPPH(G)
+    n_rep_cells = len({repr(col) for rep in result.reps for col in rep})
+    stores = [segment.cols for segment in result.reps._segments]
+    assert sum(len(cols) for cols in stores if cols is not None) <= n_rep_cells
+    no_reps = make_grounded_pipeline(
+        ShortestPathFiltration,
+        RegularPathHomology,
+        backend=LoPHATBackend(with_reps=False),
+        optimisation_strat=all_optimisations,
+    )(G)
+    assert len(pickle.dumps(result)) < 20 * len(pickle.dumps(no_reps))
+
+
+def test_rep_retention():
+    G = _collapsing_ls_graph()
+    G.add_edges_from([(3, 0, {"weight": 1}), (1, 0, {"weight": 2})])
+    pipeline = lambda **kwargs: make_grounded_pipeline(
+        ShortestPathFiltration,
+        RegularPathHomology,
+        backend=LoPHATBackend(**kwargs),
+    )
+    full = pipeline()(G)
+    top = pipeline(rep_top_k=1)(G)
+    assert top.barcode == full.barcode
+    kept = [idx for idx, rep in enumerate(top.reps) if rep is not None]
+    assert len(kept) == 1
+    assert top.persistence()[kept[0]] == max(full.persistence())
+    assert repr(top.reps[kept[0]]) == repr(full.reps[kept[0]])
+    thresholded = pipeline(rep_threshold=np.inf)(G)
+    has_rep = [rep is not None for rep in thresholded.reps]
+    assert has_rep == np.isinf(thresholded.deaths).tolist()
+    # Discarded reps should not keep their cells alive
+    top_cells = sum(len(segment.cols or []) for segment in top.reps._segments)
+    assert top_cells == len({repr(col) for col in top.reps[kept[0]]})
+    none_kept = pipeline(rep_top_k=0)(G)
+    assert all(segment.cols is None for segment in none_kept.reps._segments)
+
+
+# The number of apparent pairs is reported with or without profiling
+def test_skipped_columns():
+    G = nx.gnp_random_graph(30, 0.1, seed=1, directed=True)
+    pipeline = lambda profile, **kwargs: make_grounded_pipeline(
+        ShortestPathFiltration,
+        DirectedFlagComplexHomology,
+        backend=LoPHATBackend(**kwargs),
+        optimisation_strat=component_empty,
+        profile=profile,
+    )
+    result = pipeline(False)(G)
+    assert result.n_skipped > 0
+    profiled = pipeline(True)(G)
+    summary = profiled.profile.summary()
+    assert summary["apparent_pairs"]["counts"]["skipped"] == result.n_skipped
+    assert profiled.n_skipped == result.n_skipped
+    assert pipeline(False, apparent_pairs=False)(G).n_skipped == 0
+
+
+# The list view is cached, and editing it in place updates the arrays
+def test_barcode_list_view():
+    result = Result(barcode=[[0, 1], [0, 2]])
+    barcode = result.barcode
+    assert result.barcode is barcode
+    barcode.append([1, np.inf])
+    assert result.num_features() == 3
+    assert result.num_infinite_features() == 1
+    barcode[0][1] = 4
+    assert result.deaths.tolist() == [4, 2, np.inf]
+    assert result.barcode is barcode
+    result.add_bar([0, 3])
+    assert result.barcode == [[0, 4], [0, 2], [1, np.inf], [0, 3]]
+    # Edits to an outdated list are ignored
+    barcode.clear()
+    assert result.num_features() == 4
+    copy = pickle.loads(pickle.dumps(result))
+    assert copy.barcode == result.barcode
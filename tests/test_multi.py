@@ -0,0 +1,19 @@
+import networkx as nx
+from grpphati.pipelines import multi
+from grpphati.pipelines.multi import all_descriptors
+
+
+def test_low_cells_shared(monkeypatch):
+    calls = []
+    low_cells = multi._low_cells
+
+    def counting_low_cells(G, filtration, homology, grounded):
+        calls.append(grounded)
+        return low_cells(G, filtration, homology, grounded)
+
+    monkeypatch.setattr(multi, "_low_cells", counting_low_cells)
+    G = nx.gnp_random_graph(10, 0.3, seed=0, directed=True)
+    results = all_descriptors(G)
+    assert set(results) == {"GrPPH", "GrPdFlH", "PPH", "PdFlH"}
+    # Once for GrPPH and GrPdFlH, once for PPH and PdFlH
+    assert sorted(calls) == [False, True]
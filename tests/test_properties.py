@@ -1,7 +1,8 @@
 from grpphati.homologies.directed_flag import DirectedFlagComplexHomology
-from .strats import builder, report_graph_size, valid_edge_weight
-from .utils import grounded_barcodes_equal, wedge_vertex_0
+from .strats import builder, loop_builder, report_graph_size, valid_edge_weight
+from .utils import grounded_barcodes_equal, wedge_vertex_0, is_cycle, rep_faces
 from hypothesis import given, settings, event, strategies as st
+from grpphati.pipelines.standard import make_standard_pipeline
 from grpphati.pipelines.grounded import (
     GrPPH,
     GrPPH_par_wedge,
@@ -9,9 +10,27 @@ from grpphati.pipelines.grounded import (
     make_grounded_pipeline,
 )
 from grpphati.homologies import RegularPathHomology, DirectedFlagComplexHomology
-from grpphati.filtrations import ShortestPathFiltration
+from grpphati.filtrations import (
+    ShortestPathFiltration,
+    ArrayShortestPathFiltration,
+    TruncatedFiltration,
+)
+from grpphati.truncations import cone_time
+from grpphati.optimisations import (
+    all_optimisations_serial,
+    parallel_over_components,
+    check_empty,
+    ResultCache,
+)
+from grpphati.backends import LoPHATBackend
+from grpphati.utils.concurrency import ConcurrencyBudget
+from grpphati.pipelines.multi import all_descriptors
+from grpphati.pipelines.incremental import IncrementalGrPPH
+from grpphati.pipelines.standard import PPH, PdFlH
+from grpphati.optimisations.dispatch import schedule, pack_component, unpack_component
 import networkx as nx
 import numpy as np
+import tempfile
 
 
 unoptimised_GrPPH = make_grounded_pipeline(
@@ -22,6 +41,17 @@ unoptimised_GrPdFlH = make_grounded_pipeline(
     ShortestPathFiltration, DirectedFlagComplexHomology, optimisation_strat=None
 )
 
+array_GrPPH = make_grounded_pipeline(
+    ArrayShortestPathFiltration,
+    RegularPathHomology,
+    optimisation_strat=None,
+    truncation_strat=cone_time,
+)
+
+array_GrPdFlH = make_grounded_pipeline(
+    ArrayShortestPathFiltration, DirectedFlagComplexHomology, optimisation_strat=None
+)
+
 
 @given(G=builder)
 @settings(deadline=None)
@@ -40,6 +70,16 @@ def test_par_wedge_agrees(G):
     assert grounded_barcodes_equal(barcode1, barcode2)
 
 
+# Self-loops are wedge summands on their own, each contributing one essential bar
+@given(G=loop_builder)
+@settings(deadline=None)
+@report_graph_size
+def test_par_wedge_agrees_with_self_loops(G):
+    barcode = unoptimised_GrPPH(G).barcode
+    assert grounded_barcodes_equal(GrPPH(G).barcode, barcode)
+    assert grounded_barcodes_equal(GrPPH_par_wedge(G).barcode, barcode)
+
+
 @given(G=builder)
 @settings(deadline=None)
 @report_graph_size
@@ -49,6 +89,282 @@ def test_grpph_simple_optimisations(G):
     assert grounded_barcodes_equal(barcode1, barcode2)
 
 
+@given(G=builder)
+@settings(deadline=None)
+@report_graph_size
+def test_array_filtration_agrees_GrPPH(G):
+    barcode1 = GrPPH(G).barcode
+    barcode2 = array_GrPPH(G).barcode
+    assert grounded_barcodes_equal(barcode1, barcode2)
+
+
+@given(G=builder)
+@settings(deadline=None)
+@report_graph_size
+def test_array_filtration_agrees_GrPdFlH(G):
+    barcode1 = GrPdFlH(G).barcode
+    barcode2 = array_GrPdFlH(G).barcode
+    assert grounded_barcodes_equal(barcode1, barcode2)
+
+
+# Self-loops of G are not on the diagonal of the distance matrix, but still enter at 0
+@given(G=loop_builder)
+@settings(deadline=None)
+@report_graph_size
+def test_array_filtration_agrees_with_self_loops(G):
+    assert grounded_barcodes_equal(
+        unoptimised_GrPPH(G).barcode, array_GrPPH(G).barcode
+    )
+    assert grounded_barcodes_equal(
+        unoptimised_GrPdFlH(G).barcode, array_GrPdFlH(G).barcode
+    )
+
+
+@given(G=builder)
+@settings(deadline=None)
+@report_graph_size
+def test_array_filtration_agrees_PPH(G):
+    barcode1 = make_standard_pipeline(ShortestPathFiltration, RegularPathHomology)(
+        G
+    ).barcode
+    barcode2 = make_standard_pipeline(
+        ArrayShortestPathFiltration, RegularPathHomology
+    )(G).barcode
+    assert sorted(barcode1) == sorted(barcode2)
+
+
+# Spawning worker processes is slow so we check fewer examples
+@given(G=builder)
+@settings(deadline=None, max_examples=10)
+@report_graph_size
+def test_parallel_array_filtration_agrees(G):
+    serial = ArrayShortestPathFiltration(G)
+    parallel = ArrayShortestPathFiltration(G, n_jobs=2)
+    assert np.array_equal(serial.distance_matrix(), parallel.distance_matrix())
+
+
+@given(G=builder, max_time=valid_edge_weight)
+@settings(deadline=None)
+@report_graph_size
+def test_max_time_truncates(G, max_time):
+    cutoff_GrPPH = make_grounded_pipeline(
+        ShortestPathFiltration, RegularPathHomology, max_time=max_time
+    )
+    truncated_GrPPH = make_grounded_pipeline(
+        lambda G: TruncatedFiltration(ShortestPathFiltration(G), max_time),
+        RegularPathHomology,
+    )
+    barcode1 = cutoff_GrPPH(G).barcode
+    barcode2 = truncated_GrPPH(G).barcode
+    assert grounded_barcodes_equal(barcode1, barcode2)
+
+
+@given(G=builder)
+@settings(deadline=None, max_examples=20)
+@report_graph_size
+def test_profiling_preserves_barcode(G):
+    profiled_GrPPH = make_grounded_pipeline(
+        ShortestPathFiltration,
+        RegularPathHomology,
+        optimisation_strat=all_optimisations_serial,
+        truncation_strat=cone_time,
+        profile=True,
+    )
+    result = profiled_GrPPH(G)
+    assert grounded_barcodes_equal(result.barcode, GrPPH(G).barcode)
+    stages = result.profile.summary()
+    assert stages["total"]["calls"] == 1
+    assert "components" in stages
+    if G.number_of_nodes() > 0:
+        assert "wedges" in stages
+    assert GrPPH(G).profile is None
+
+
+@given(G=builder, x_range=st.lists(valid_edge_weight, max_size=10))
+@settings(deadline=None)
+@report_graph_size
+def test_betti_curve(G, x_range):
+    result = GrPPH(G)
+    expected = [
+        len(result.barcode) - len([True for bar in result.barcode if bar[1] <= x])
+        for x in x_range
+    ]
+    assert result.compute_betti_curve(x_range) == expected
+
+
+@given(G=builder)
+@settings(deadline=None)
+@report_graph_size
+def test_h0_clearing_agrees(G):
+    unclearing_GrPPH = make_grounded_pipeline(
+        ShortestPathFiltration,
+        RegularPathHomology,
+        backend=LoPHATBackend(clear_h0=False),
+    )
+    result = unoptimised_GrPPH(G)
+    assert grounded_barcodes_equal(result.barcode, unclearing_GrPPH(G).barcode)
+    # Essential reps are rebuilt from the spanning forest, so check they are cycles
+    for rep in result.reps:
+        assert is_cycle(rep)
+
+
+@given(G=builder)
+@settings(deadline=None)
+@report_graph_size
+def test_apparent_pairs_agree(G):
+    plain_GrPdFlH = make_grounded_pipeline(
+        ShortestPathFiltration,
+        DirectedFlagComplexHomology,
+        backend=LoPHATBackend(clear_h0=False, apparent_pairs=False),
+    )
+    result = unoptimised_GrPdFlH(G)
+    assert grounded_barcodes_equal(result.barcode, plain_GrPdFlH(G).barcode)
+    for rep in result.reps:
+        assert is_cycle(rep)
+
+
+@given(G=builder)
+@settings(deadline=None, max_examples=20)
+@report_graph_size
+def test_cache_agrees(G):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResultCache(maxsize=4, cache_dir=cache_dir)
+        cached_GrPPH = make_grounded_pipeline(
+            ShortestPathFiltration,
+            RegularPathHomology,
+            optimisation_strat=lambda pipeline: parallel_over_components(
+                check_empty(pipeline), n_jobs=1, cache=cache
+            ),
+        )
+        barcode = unoptimised_GrPPH(G).barcode
+        assert grounded_barcodes_equal(cached_GrPPH(G).barcode, barcode)
+        # Second run is served from memory, or from disk for evicted components
+        misses = cache.misses
+        assert grounded_barcodes_equal(cached_GrPPH(G).barcode, barcode)
+        assert cache.misses == misses
+        cache.clear()
+        assert grounded_barcodes_equal(cached_GrPPH(G).barcode, barcode)
+        assert cache.misses == misses
+
+
+@given(G=builder, n_copies=st.integers(min_value=1, max_value=3))
+@settings(deadline=None)
+@report_graph_size
+def test_deduplication_agrees(G, n_copies):
+    dedup_GrPPH = make_grounded_pipeline(
+        ShortestPathFiltration,
+        RegularPathHomology,
+        optimisation_strat=lambda pipeline: parallel_over_components(
+            check_empty(pipeline), n_jobs=1, deduplicate=True
+        ),
+    )
+    union = nx.disjoint_union_all([G] * n_copies)
+    result = dedup_GrPPH(union)
+    barcode = unoptimised_GrPPH(G).barcode * n_copies
+    assert grounded_barcodes_equal(result.barcode, barcode)
+    # Relabelled reps must still be cycles, in the nodes of their own copy
+    for rep in result.reps:
+        assert is_cycle(rep)
+        copies = {face.node // len(G) for face in rep_faces(rep)}
+        assert len(copies) <= 1
+
+
+@given(costs=st.lists(st.integers(min_value=1, max_value=10000)))
+def test_schedule_covers_components(costs):
+    inline, tasks = schedule(costs, inline_cost=16, batch_cost=4096)
+    scheduled = inline + [idx for task in tasks for idx in task]
+    assert sorted(scheduled) == list(range(len(costs)))
+    assert all(costs[idx] <= 16 for idx in inline)
+    totals = [sum(costs[idx] for idx in task) for task in tasks]
+    assert totals == sorted(totals, reverse=True)
+
+
+@given(G=builder)
+@settings(deadline=None)
+@report_graph_size
+def test_packed_components_agree(G):
+    G = nx.relabel_nodes(G, {node: f"v{node}" for node in G.nodes})
+    # The builder attaches node data, which forces a copy of the subgraph
+    assert pack_component(G, G.nodes)[0] is None
+    bare = nx.DiGraph()
+    bare.add_nodes_from(G.nodes)
+    bare.add_edges_from(G.edges(data=True))
+    packed = pack_component(bare, bare.nodes)
+    assert packed[0] is not None
+    unpacked = unpack_component(packed)
+    assert list(unpacked.nodes) == list(bare.nodes)
+    assert list(unpacked.edges(data=True)) == list(bare.edges(data=True))
+    assert grounded_barcodes_equal(
+        unoptimised_GrPPH(unpacked).barcode, unoptimised_GrPPH(G).barcode
+    )
+
+
+@given(G=builder, n_threads=st.integers(min_value=1, max_value=4))
+@settings(deadline=None, max_examples=20)
+@report_graph_size
+def test_budget_agrees(G, n_threads):
+    budget = ConcurrencyBudget(n_threads)
+    budgeted_GrPPH = make_grounded_pipeline(
+        ShortestPathFiltration,
+        RegularPathHomology,
+        optimisation_strat=all_optimisations_serial,
+        budget=budget,
+    )
+    assert grounded_barcodes_equal(
+        budgeted_GrPPH(G).barcode, unoptimised_GrPPH(G).barcode
+    )
+    n_workers = budget.workers(-1, n_tasks=3)
+    assert 1 <= n_workers <= min(n_threads, 3)
+    assert n_workers * budget.share(n_workers).n_threads <= n_threads
+
+
+@given(G=builder)
+@settings(deadline=None)
+@report_graph_size
+def test_multi_pipeline_agrees(G):
+    results = all_descriptors(G)
+    for name, pipeline in [
+        ("GrPPH", GrPPH),
+        ("GrPdFlH", GrPdFlH),
+        ("PPH", PPH),
+        ("PdFlH", PdFlH),
+    ]:
+        assert sorted(results[name].barcode) == sorted(pipeline(G).barcode)
+
+
+# Each edit removes (u, v) if weight is None, otherwise inserts or reweights it
+@given(
+    G=builder,
+    edits=st.lists(
+        st.tuples(
+            st.integers(min_value=0, max_value=31),
+            st.integers(min_value=0, max_value=31),
+            st.one_of(st.none(), valid_edge_weight),
+        ),
+        max_size=4,
+    ),
+)
+@settings(deadline=None)
+@report_graph_size
+def test_incremental_agrees(G, edits):
+    G = G.copy()
+    incremental = IncrementalGrPPH(G)
+    for u, v, weight in edits:
+        if u == v:
+            continue
+        if weight is None:
+            if not G.has_edge(u, v):
+                continue
+            G.remove_edge(u, v)
+            incremental.remove_edge(u, v)
+        else:
+            G.add_edge(u, v, weight=weight)
+            incremental.add_edge(u, v, weight)
+        assert grounded_barcodes_equal(
+            incremental.result().barcode, unoptimised_GrPPH(G).barcode
+        )
+
+
 # Note: We don't use par_wedge because otherwise this test is true by definition
 @given(G_1=builder, G_2=builder)
 @settings(deadline=None)
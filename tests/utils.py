@@ -21,3 +21,13 @@ def grounded_barcodes_equal(barcode1, barcode2, tolerance=None):
                 grounded_unique_rep(barcode1), grounded_unique_rep(barcode2)
             )
         )
+
+
+def rep_faces(rep):
+    return [face for col in rep for face in col.boundary()]
+
+
+# A rep is a cycle if every face appears an even number of times in its boundary
+def is_cycle(rep):
+    faces = rep_faces(rep)
+    return all(faces.count(face) % 2 == 0 for face in faces)